@@ -65,6 +65,7 @@ DEFAULT_CONFIG = {
         "chat_open_delay": 0.5,
         "dictation_release_delay": 0.5,
         "clipboard_delay": 0.1,
+        "clipboard_timeout": 0.2,  # Máximo esperando a que Ctrl+C actualice el portapapeles (Windows)
         "key_delay": 0.1
     },
 
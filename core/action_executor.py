@@ -84,8 +84,29 @@ class ActionExecutor:
         self.sound_player = sound_player
         self.overlay = overlay
 
+    def compile_pipeline(self, actions: list,
+                         command_name: str = "custom") -> Callable[[], bool]:
+        """
+        Prepara un pipeline una sola vez, al cargar el comando.
+
+        Lo que no depende de la ejecución se calcula aquí: si ninguna acción
+        (ni sub-acción de un condition) usa {clipboard}, cada ejecución se
+        ahorra leer el portapapeles para el contexto.
+
+        Returns:
+            Función sin argumentos que ejecuta el pipeline (ver execute_pipeline)
+        """
+        actions = list(actions)
+        read_clipboard = "{clipboard}" in json.dumps(actions, ensure_ascii=False)
+
+        def run() -> bool:
+            return self.execute_pipeline(actions, command_name,
+                                         read_clipboard=read_clipboard)
+        return run
+
     def execute_pipeline(self, actions: list, command_name: str = "custom",
-                         initial_context: Optional[dict] = None) -> bool:
+                         initial_context: Optional[dict] = None,
+                         read_clipboard: bool = True) -> bool:
         """
         Ejecuta lista de acciones en orden con contexto compartido.
 
@@ -93,12 +114,13 @@ class ActionExecutor:
             actions: Lista de dicts con definición de acciones
             command_name: Nombre del comando (para logs)
             initial_context: Contexto inicial opcional (para tests o encadenamiento)
+            read_clipboard: Si False, el contexto no incluye {clipboard}
 
         Returns:
             True si todas las acciones se ejecutaron OK
         """
         # Inicializar contexto con variables predefinidas
-        context = self._create_initial_context(initial_context)
+        context = self._create_initial_context(initial_context, read_clipboard)
 
         for i, action in enumerate(actions):
             action_type = action.get("type", "unknown")
@@ -128,14 +150,15 @@ class ActionExecutor:
                 return False
         return True
 
-    def _create_initial_context(self, initial: Optional[dict] = None) -> dict:
+    def _create_initial_context(self, initial: Optional[dict] = None,
+                                read_clipboard: bool = True) -> dict:
         """Crea el contexto inicial con variables predefinidas."""
-        context = {
-            "clipboard": pyperclip.paste() or "",
+        context = {"clipboard": pyperclip.paste() or ""} if read_clipboard else {}
+        context.update({
             "date": date.today().isoformat(),
             "time": datetime.now().strftime("%H:%M"),
             "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
-        }
+        })
         if initial:
             context.update(initial)
         return context
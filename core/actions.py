@@ -1,9 +1,11 @@
 import atexit
+import functools
 import re
 import signal
 import subprocess
 import sys
 import time
+import types
 
 import pyautogui
 import pyperclip
@@ -12,13 +14,16 @@ import pyperclip
 pyautogui.PAUSE = 0.1  # Pausa entre acciones (100ms)
 pyautogui.FAILSAFE = True  # Mover mouse a esquina aborta (seguridad)
 
+from core import win32
+from core.state import State
+
 # Importar aliases para limpiar comandos del texto dictado
 from config.aliases import (
     LISTO_ALIASES, CANCELA_ALIASES, ENVIAR_ALIASES, AYUDA_ALIASES
 )
 
 # Wake-words que pueden aparecer al inicio del comando y deben eliminarse
-WAKE_WORDS = {"alexa", "hey jarvis", "jarvis", "oye", "hola"}
+WAKE_WORDS = frozenset({"alexa", "hey jarvis", "jarvis", "oye", "hola"})
 
 # Comandos que pueden aparecer al final del dictado y deben eliminarse
 COMANDOS_DICTADO = set()
@@ -28,6 +33,38 @@ for aliases in [LISTO_ALIASES, CANCELA_ALIASES, ENVIAR_ALIASES, AYUDA_ALIASES]:
 # Añadir wake-words también a comandos (pueden aparecer al final)
 COMANDOS_DICTADO.update(WAKE_WORDS)
 
+# Solo se consultan (nunca se modifican tras construirse)
+COMANDOS_DICTADO = frozenset(COMANDOS_DICTADO)
+
+# Puntos/comas que quedan huérfanos al final tras quitar comandos
+_PUNTOS_HUERFANOS_RE = re.compile(r'\s*[.,]+\s*$')
+
+
+def _alternativas(palabras) -> str:
+    """Alternancia regex de palabras, más largas primero (aliases solapados)"""
+    return '|'.join(
+        re.escape(p).replace(r'\ ', r'\s+')
+        for p in sorted(palabras, key=lambda p: (-len(p), p))
+    )
+
+
+# Una o más wake-words (con su puntuación) al inicio del texto
+_HEAD_WAKE_RE = re.compile(
+    r'^\s*(?:[.,!?;:]*(?:' + _alternativas(WAKE_WORDS) + r')[.,!?;:]*(?:\s+|$))+',
+    re.IGNORECASE
+)
+
+_COMANDOS_ALT = _alternativas(COMANDOS_DICTADO)
+
+
+@functools.lru_cache(maxsize=8)
+def _tail_cmd_re(num_palabras: int) -> re.Pattern:
+    """Hasta `num_palabras` comandos seguidos (con su puntuación) al final del texto"""
+    return re.compile(
+        r'(?:(?:^|\s+)[.,!?;:]*(?:' + _COMANDOS_ALT + r')[.,!?;:]*){1,%d}\s*$' % num_palabras,
+        re.IGNORECASE
+    )
+
 
 def _limpiar_comandos_finales(texto: str, num_palabras: int = 5) -> str:
     """
@@ -38,7 +75,7 @@ def _limpiar_comandos_finales(texto: str, num_palabras: int = 5) -> str:
 
     Args:
         texto: El texto dictado
-        num_palabras: Número de palabras finales a revisar
+        num_palabras: Número máximo de comandos finales a quitar
 
     Returns:
         Texto limpio sin comandos ni wake-words
@@ -46,43 +83,49 @@ def _limpiar_comandos_finales(texto: str, num_palabras: int = 5) -> str:
     if not texto:
         return texto
 
-    # Separar en palabras
-    palabras = texto.split()
-    if not palabras:
-        return texto
+    # Atajo: sin wake-word al inicio ni comando al final no hay nada que
+    # quitar. Usa los mismos patrones que la limpieza (wake-words de varias
+    # palabras como "hey jarvis" incluidas); ambos están anclados, así que
+    # no recorren todo el texto.
+    if not _HEAD_WAKE_RE.match(texto) and not _tail_cmd_re(1).search(texto):
+        return _PUNTOS_HUERFANOS_RE.sub('', texto).strip()
 
     # 1. Limpiar wake-words al INICIO
-    while palabras:
-        palabra_limpia = re.sub(r'[.,!?;:]', '', palabras[0].lower())
-        if palabra_limpia in WAKE_WORDS:
-            palabras.pop(0)
-        else:
-            break
+    texto_limpio = _HEAD_WAKE_RE.sub('', texto)
 
-    if not palabras:
-        return ""
+    # 2. Limpiar comandos al FINAL
+    texto_limpio = _tail_cmd_re(num_palabras).sub('', texto_limpio)
 
-    # 2. Limpiar comandos al FINAL (últimas N palabras)
-    inicio_revision = max(0, len(palabras) - num_palabras)
-    palabras_finales = palabras[inicio_revision:]
-    palabras_limpias = []
+    # Limpiar puntos finales que quedan huérfanos
+    return _PUNTOS_HUERFANOS_RE.sub('', texto_limpio).strip()
 
-    for palabra in palabras_finales:
-        # Limpiar puntuación para comparar
-        palabra_limpia = re.sub(r'[.,!?;:]', '', palabra.lower())
-        if palabra_limpia not in COMANDOS_DICTADO:
-            palabras_limpias.append(palabra)
 
-    # Reconstruir texto
-    texto_limpio = ' '.join(palabras[:inicio_revision] + palabras_limpias)
+def _preparar_dictado(texto: str) -> str:
+    """Limpia comandos de las últimas 5 palabras y capitaliza la primera letra"""
+    texto_limpio = _limpiar_comandos_finales(texto, num_palabras=5)
+    # [:1] cubre texto vacío y de un carácter
+    return texto_limpio[:1].upper() + texto_limpio[1:]
 
-    # Limpiar puntos finales que quedan huérfanos
-    texto_limpio = re.sub(r'\s*[.,]+\s*$', '', texto_limpio).strip()
 
-    return texto_limpio
+@functools.lru_cache(maxsize=64)
+def _parse_hotkey(hotkey: str) -> tuple:
+    """Separa una combinación ("ctrl+enter") en sus teclas (cacheado)"""
+    return tuple(hotkey.split("+"))
 
 
-NUMEROS = {
+# Secuencias de teclado precalculadas (un solo SendInput por secuencia)
+if win32.AVAILABLE:
+    _SEQ_RELEASE_WISPR = win32.build_inputs([(win32.VK_LWIN, False), (win32.VK_CONTROL, False)])
+    _SEQ_SELECT_COPY = win32.build_inputs(
+        win32.combo(win32.VK_CONTROL, win32.VK_A) + win32.combo(win32.VK_CONTROL, win32.VK_C)
+    )
+    _SEQ_PASTE = win32.build_inputs(win32.combo(win32.VK_CONTROL, win32.VK_V))
+    _SEQ_CLEAR_ALL = win32.build_inputs(
+        win32.combo(win32.VK_CONTROL, win32.VK_A) + win32.combo(win32.VK_DELETE)
+    )
+
+
+NUMEROS = types.MappingProxyType({
     "uno": 1, "una": 1,
     "dos": 2,
     "tres": 3,
@@ -93,8 +136,63 @@ NUMEROS = {
     "ocho": 8,
     "nueve": 9,
     "cero": 0,
+})
+
+# Teclas de los dígitos 0-9 (evita str(numero) en cada pulsación)
+_DIGITOS = tuple(str(i) for i in range(10))
+
+# Descripciones de comandos (user-friendly)
+_HELP_DESCRIPTIONS = {
+    "code": "Abre chat de Claude en VSCode",
+    "code dictado": "Abre Claude y empieza a dictar",
+    "dictado": "Empieza a dictar texto",
+    "listo": "Termina y envía el dictado",
+    "cancela": "Cancela sin enviar",
+    "enviar": "Envía el mensaje",
+    "enter": "Confirma / nueva línea",
+    "seleccion": "Selecciona todo el texto",
+    "eliminar": "Borra lo seleccionado",
+    "borra todo": "Borra todo el texto",
+    "escape": "Cierra o cancela",
+    "tab": "Salta al siguiente campo",
+    "aceptar": "Acepta la opción",
+    "copiar": "Copia al portapapeles",
+    "pegar": "Pega del portapapeles",
+    "deshacer": "Deshace el último cambio",
+    "rehacer": "Rehace lo deshecho",
+    "guardar": "Guarda el archivo",
+    "arriba": "Mueve hacia arriba",
+    "abajo": "Mueve hacia abajo",
+    "izquierda": "Mueve a la izquierda",
+    "derecha": "Mueve a la derecha",
+    "inicio": "Va al principio",
+    "fin": "Va al final",
+    "repetir": "Repite el último comando",
+    "ayuda": "Muestra esta ayuda",
+    "pausa": "Pausa el reconocimiento",
+    "reanuda": "Reanuda el reconocimiento",
+    "reiniciar": "Reinicia VoiceFlow",
 }
 
+# Nombres de estado para la ayuda por consola
+_STATE_NAMES = {
+    State.IDLE: "IDLE",
+    State.DICTATING: "DICTANDO",
+    State.PROCESSING: "PROCESANDO",
+}
+
+# Comandos para el PowerShell persistente del fallback (una línea cada uno,
+# `-Command -` ejecuta cada línea al recibirla)
+_PS_WIN_TYPE = (
+    "Add-Type -TypeDefinition 'using System; using System.Runtime.InteropServices; "
+    "public class Win { [DllImport(\"user32.dll\")] public static extern bool SetForegroundWindow(IntPtr hWnd); }'"
+)
+_PS_FOCUS_VSCODE = (
+    '$hwnd = (Get-Process | Where-Object { $_.MainWindowTitle -like "*Visual Studio Code*" } '
+    '| Select-Object -First 1).MainWindowHandle; '
+    'if ($hwnd) { [void][Win]::SetForegroundWindow($hwnd) }'
+)
+
 # Instancia global para cleanup
 _actions_instance = None
 
@@ -104,8 +202,13 @@ def _emergency_release():
     if _actions_instance and _actions_instance._wispr_active:
         print("\n[SAFETY] Liberando teclas Ctrl+Win...")
         try:
-            pyautogui.keyUp('win')
-            pyautogui.keyUp('ctrl')
+            if win32.AVAILABLE:
+                # Un solo SendInput con los INPUT precalculados: sin pyautogui
+                # ni asignaciones dentro del handler de señal
+                win32.send_inputs(_SEQ_RELEASE_WISPR)
+            else:
+                pyautogui.keyUp('win')
+                pyautogui.keyUp('ctrl')
         except Exception:
             pass  # Ignorar errores en cleanup de emergencia
 
@@ -122,8 +225,29 @@ signal.signal(signal.SIGINT, _signal_handler)
 if sys.platform == 'win32':
     signal.signal(signal.SIGBREAK, _signal_handler)
 
+def _stop_powershell():
+    """Termina el PowerShell persistente del fallback de foco, si sigue vivo."""
+    proc = _actions_instance._ps_proc if _actions_instance is not None else None
+    if proc is not None and proc.poll() is None:
+        proc.terminate()
+
+
+# Registrar cleanup al salir (una sola vez, lee _actions_instance al ejecutarse)
+atexit.register(_emergency_release)
+atexit.register(_stop_powershell)
+
 
 class Actions:
+    # Atributos fijos: sin __dict__ por instancia y acceso más rápido en los hot paths
+    __slots__ = (
+        'config', 'debug_mode', 'dictation_mode',
+        '_wispr_active', '_winh_active',
+        '_vscode_focus_delay', '_chat_open_delay', '_dictation_release_delay',
+        '_clipboard_delay', '_clipboard_timeout', '_key_delay',
+        '_last_action', '_hotkey_keys', '_vscode_hwnd', '_ps_proc',
+        '_dispatch_dictado', '_dispatch_listo', '_dispatch_cancela',
+    )
+
     def __init__(self, config: dict, debug_mode: bool = False, dictation_mode: str = "wispr"):
         global _actions_instance
         self.config = config
@@ -133,30 +257,161 @@ class Actions:
         self._winh_active = False
         _actions_instance = self
 
+        # Implementaciones segun el modo de dictado (resueltas una sola vez)
+        if dictation_mode == "winh":
+            self._dispatch_dictado = self._on_dictado_winh
+            self._dispatch_listo = self._on_listo_winh
+            self._dispatch_cancela = self._on_cancela_winh
+        else:
+            self._dispatch_dictado = self._on_dictado_wispr
+            self._dispatch_listo = self._on_listo_wispr
+            self._dispatch_cancela = self._on_cancela_wispr
+
         # Timings configurables
         timing = config.get("timing", {})
         self._vscode_focus_delay = timing.get("vscode_focus_delay", 0.3)
         self._chat_open_delay = timing.get("chat_open_delay", 0.5)
         self._dictation_release_delay = timing.get("dictation_release_delay", 0.5)
         self._clipboard_delay = timing.get("clipboard_delay", 0.1)
+        self._clipboard_timeout = timing.get("clipboard_timeout", 0.2)
         self._key_delay = timing.get("key_delay", 0.1)
 
-        # Ultima accion para comando "repetir"
+        # Ultima accion para comando "repetir": (metodo, args) sin closures
         self._last_action = None
 
-        # Registrar cleanup al salir
-        atexit.register(_emergency_release)
+        # Hotkeys pre-parseadas (la config no cambia en caliente)
+        self._hotkey_keys = {
+            name: _parse_hotkey(value)
+            for name, value in config.get("hotkeys", {}).items()
+        }
+        self._hotkey_keys.setdefault("vscode_chat", _parse_hotkey("ctrl+alt+shift+g"))
+
+        # HWND de VSCode cacheado (se revalida con IsWindow antes de usarlo)
+        self._vscode_hwnd = None
+
+        # PowerShell persistente del fallback (se lanza en el primer uso)
+        self._ps_proc = None
 
     def _focus_vscode(self):
-        """Enfoca la ventana de VSCode usando PowerShell"""
-        ps_command = '''
-$hwnd = (Get-Process | Where-Object { $_.MainWindowTitle -like "*Visual Studio Code*" } | Select-Object -First 1).MainWindowHandle
-if ($hwnd) {
-    Add-Type -TypeDefinition 'using System; using System.Runtime.InteropServices; public class Win { [DllImport("user32.dll")] public static extern bool SetForegroundWindow(IntPtr hWnd); }'
-    [Win]::SetForegroundWindow($hwnd)
-}
-'''
-        subprocess.run(['powershell', '-Command', ps_command], capture_output=True)
+        """Enfoca la ventana de VSCode (user32 directo, PowerShell como fallback)"""
+        if win32.AVAILABLE:
+            try:
+                # Camino rápido: HWND cacheado; si ya no es válido, se enumera
+                hwnd = self._vscode_hwnd
+                if not win32.is_window(hwnd):
+                    hwnd = win32.find_window("Visual Studio Code")
+                    self._vscode_hwnd = hwnd
+                if hwnd:
+                    win32.set_foreground(hwnd)
+                return
+            except OSError as e:
+                print(f"[Actions] user32 no disponible ({e}), usando PowerShell")
+                self._vscode_hwnd = None
+
+        self._focus_vscode_powershell()
+
+    def _focus_vscode_and_wait(self, timeout: float):
+        """
+        Enfoca VSCode y espera a que sea la ventana activa.
+
+        En Windows termina en cuanto la ventana pasa a primer plano (como
+        máximo `timeout`); sin HWND conocido duerme `timeout` entero.
+        """
+        self._focus_vscode()
+        if win32.AVAILABLE and self._vscode_hwnd:
+            win32.wait_foreground(self._vscode_hwnd, timeout)
+        else:
+            time.sleep(timeout)
+
+    def _focus_vscode_powershell(self):
+        """
+        Enfoca la ventana de VSCode vía PowerShell (lento, solo fallback).
+
+        Reutiliza un proceso `powershell -Command -` que lee comandos por
+        stdin: el arranque (~200 ms) y el Add-Type se pagan una sola vez.
+        No espera respuesta; los callers ya esperan a que VSCode tenga el
+        foco (o duermen el delay configurado).
+        """
+        proc = self._ps_proc
+        try:
+            if proc is None or proc.poll() is not None:
+                proc = subprocess.Popen(
+                    ['powershell', '-NoProfile', '-NonInteractive', '-Command', '-'],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+                )
+                self._ps_proc = proc  # _stop_powershell lo termina al salir
+                proc.stdin.write(_PS_WIN_TYPE + "\n")
+            proc.stdin.write(_PS_FOCUS_VSCODE + "\n")
+            proc.stdin.flush()
+        except OSError as e:
+            print(f"[Actions] Error enfocando VSCode con PowerShell: {e}")
+            self._ps_proc = None
+
+    def _release_wispr_keys(self):
+        """Suelta Win+Ctrl (un solo SendInput en Windows)"""
+        if win32.AVAILABLE:
+            win32.send_inputs(_SEQ_RELEASE_WISPR)
+        else:
+            pyautogui.keyUp('win')
+            pyautogui.keyUp('ctrl')
+
+    def _clear_all(self):
+        """Ctrl+A + Delete (un solo SendInput en Windows, sin esperas)"""
+        if win32.AVAILABLE:
+            win32.send_inputs(_SEQ_CLEAR_ALL)
+        else:
+            pyautogui.hotkey('ctrl', 'a')
+            time.sleep(self._key_delay)
+            pyautogui.press('delete')
+
+    def _select_and_copy(self):
+        """
+        Ctrl+A seguido de Ctrl+C (un solo SendInput en Windows).
+
+        En Windows espera a que cambie el número de secuencia del
+        portapapeles en lugar de dormir un tiempo fijo.
+        """
+        if win32.AVAILABLE:
+            seq = win32.clipboard_sequence()
+            win32.send_inputs(_SEQ_SELECT_COPY)
+            win32.wait_clipboard_change(seq, self._clipboard_timeout)
+        else:
+            pyautogui.hotkey('ctrl', 'a')
+            time.sleep(self._clipboard_delay)
+            pyautogui.hotkey('ctrl', 'c')
+            time.sleep(self._clipboard_delay)
+
+    def _paste(self):
+        """Ctrl+V (SendInput directo en Windows, sin la pausa de pyautogui)"""
+        if win32.AVAILABLE:
+            win32.send_inputs(_SEQ_PASTE)
+        else:
+            pyautogui.hotkey('ctrl', 'v')
+
+    def _limpiar_portapapeles(self):
+        """
+        Quita comandos del texto copiado y lo deja capitalizado en el portapapeles.
+
+        En Windows lee y escribe en una sola apertura del portapapeles; si
+        la API Win32 falla se usa pyperclip con el texto ya leído (el
+        dictado no se pierde aunque el portapapeles se haya vaciado).
+        """
+        text = None
+        if win32.AVAILABLE:
+            try:
+                with win32.clipboard_session() as cb:
+                    text = cb.get_text()
+                    cb.set_text(_preparar_dictado(text))
+                return
+            except OSError as e:
+                print(f"[Actions] Error con el portapapeles Win32, usando pyperclip: {e}")
+        if text is None:
+            text = pyperclip.paste()
+        pyperclip.copy(_preparar_dictado(text))
 
     def on_claudia(self):
         """Activa VSCode + Chat (sin Wispr)"""
@@ -165,31 +420,23 @@ if ($hwnd) {
             return
 
         # Enfocar VSCode
-        self._focus_vscode()
-        time.sleep(self._vscode_focus_delay)
+        self._focus_vscode_and_wait(self._vscode_focus_delay)
 
         # Abrir chat (hotkey configurable)
-        hotkey = self.config.get("hotkeys", {}).get("vscode_chat", "ctrl+alt+shift+g")
-        keys = hotkey.split("+")
-        pyautogui.hotkey(*keys)
+        pyautogui.hotkey(*self._hotkey_keys["vscode_chat"])
 
     def on_claudia_dictado(self, state_machine):
         """Activa VSCode + Chat + Dictado automaticamente"""
-        from core.state import State
-
         if self.debug_mode:
             print("[DEBUG] on_claudia_dictado: VSCode + Chat + Dictado")
             state_machine.transition(State.DICTATING)
             return
 
         # Enfocar VSCode
-        self._focus_vscode()
-        time.sleep(self._vscode_focus_delay)
+        self._focus_vscode_and_wait(self._vscode_focus_delay)
 
         # Abrir chat (hotkey configurable)
-        hotkey = self.config.get("hotkeys", {}).get("vscode_chat", "ctrl+alt+shift+g")
-        keys = hotkey.split("+")
-        pyautogui.hotkey(*keys)
+        pyautogui.hotkey(*self._hotkey_keys["vscode_chat"])
 
         # Esperar a que se abra el chat y activar dictado
         time.sleep(self._chat_open_delay)
@@ -198,10 +445,7 @@ if ($hwnd) {
 
     def on_dictado(self):
         """Activa dictado segun el modo configurado"""
-        if self.dictation_mode == "winh":
-            self._on_dictado_winh()
-        else:
-            self._on_dictado_wispr()
+        self._dispatch_dictado()
 
     def _on_dictado_wispr(self):
         """Activa Wispr (Ctrl+Win down)"""
@@ -215,7 +459,11 @@ if ($hwnd) {
 
         # Limpiar portapapeles para evitar que Wispr concatene con texto anterior
         try:
-            pyperclip.copy("")
+            if win32.AVAILABLE:
+                with win32.clipboard_session() as cb:
+                    cb.clear()
+            else:
+                pyperclip.copy("")
         except Exception:
             pass
 
@@ -238,10 +486,7 @@ if ($hwnd) {
 
     def on_listo(self):
         """Termina dictado segun el modo configurado"""
-        if self.dictation_mode == "winh":
-            self._on_listo_winh()
-        else:
-            self._on_listo_wispr()
+        self._dispatch_listo()
 
     def _on_listo_wispr(self):
         """Suelta Wispr y limpia el texto"""
@@ -254,27 +499,14 @@ if ($hwnd) {
             return
 
         # Soltar Ctrl+Win (Wispr pega automaticamente)
-        pyautogui.keyUp('win')
-        pyautogui.keyUp('ctrl')
+        self._release_wispr_keys()
         time.sleep(self._dictation_release_delay)
 
-        # Seleccionar y copiar texto actual
-        pyautogui.hotkey('ctrl', 'a')
-        time.sleep(self._clipboard_delay)
-        pyautogui.hotkey('ctrl', 'c')
-        time.sleep(self._clipboard_delay)
-
-        texto = pyperclip.paste()
+        # Seleccionar, copiar y limpiar texto actual
+        self._select_and_copy()
+        self._limpiar_portapapeles()
 
-        # Limpiar comandos de las últimas 5 palabras
-        texto_limpio = _limpiar_comandos_finales(texto, num_palabras=5)
-
-        # Capitalizar primera letra si hay texto
-        if texto_limpio:
-            texto_limpio = texto_limpio[0].upper() + texto_limpio[1:] if len(texto_limpio) > 1 else texto_limpio.upper()
-
-        pyperclip.copy(texto_limpio)
-        pyautogui.hotkey('ctrl', 'v')
+        self._paste()
         self._wispr_active = False
 
     def _on_listo_winh(self):
@@ -291,31 +523,16 @@ if ($hwnd) {
         pyautogui.press('escape')
         time.sleep(self._dictation_release_delay)
 
-        # Seleccionar y copiar texto actual
-        pyautogui.hotkey('ctrl', 'a')
-        time.sleep(self._clipboard_delay)
-        pyautogui.hotkey('ctrl', 'c')
-        time.sleep(self._clipboard_delay)
-
-        texto = pyperclip.paste()
+        # Seleccionar, copiar y limpiar texto actual
+        self._select_and_copy()
+        self._limpiar_portapapeles()
 
-        # Limpiar comandos de las últimas 5 palabras
-        texto_limpio = _limpiar_comandos_finales(texto, num_palabras=5)
-
-        # Capitalizar primera letra si hay texto
-        if texto_limpio:
-            texto_limpio = texto_limpio[0].upper() + texto_limpio[1:] if len(texto_limpio) > 1 else texto_limpio.upper()
-
-        pyperclip.copy(texto_limpio)
-        pyautogui.hotkey('ctrl', 'v')
+        self._paste()
         self._winh_active = False
 
     def on_cancela(self):
         """Cancela dictado segun el modo configurado"""
-        if self.dictation_mode == "winh":
-            self._on_cancela_winh()
-        else:
-            self._on_cancela_wispr()
+        self._dispatch_cancela()
 
     def _on_cancela_wispr(self):
         """Suelta Wispr y borra todo"""
@@ -333,9 +550,7 @@ if ($hwnd) {
         time.sleep(self._dictation_release_delay)
 
         # Seleccionar todo y borrar
-        pyautogui.hotkey('ctrl', 'a')
-        time.sleep(self._key_delay)
-        pyautogui.press('delete')
+        self._clear_all()
         self._wispr_active = False
 
     def _on_cancela_winh(self):
@@ -353,156 +568,110 @@ if ($hwnd) {
         time.sleep(self._key_delay)
 
         # Seleccionar todo y borrar
-        pyautogui.hotkey('ctrl', 'a')
-        time.sleep(self._key_delay)
-        pyautogui.press('delete')
+        self._clear_all()
         self._winh_active = False
 
     def on_enter(self):
         """Pulsa Enter"""
         pyautogui.press('enter')
-        self._last_action = self.on_enter
+        self._last_action = (self.on_enter, ())
 
     def on_seleccion(self):
         """Ctrl+A"""
         pyautogui.hotkey('ctrl', 'a')
-        self._last_action = self.on_seleccion
+        self._last_action = (self.on_seleccion, ())
 
     def on_eliminar(self):
         """Pulsa Delete"""
         pyautogui.press('delete')
-        self._last_action = self.on_eliminar
+        self._last_action = (self.on_eliminar, ())
 
     def on_borra_todo(self):
         """Selecciona todo y borra (Ctrl+A + Delete)"""
-        pyautogui.hotkey('ctrl', 'a')
-        time.sleep(self._key_delay)
-        pyautogui.press('delete')
-        self._last_action = self.on_borra_todo
+        self._clear_all()
+        self._last_action = (self.on_borra_todo, ())
 
     def on_ayuda(self, state, registry, overlay=None):
         """Muestra comandos disponibles en el estado actual"""
-        from core.state import State
-
-        # Descripciones de comandos (user-friendly)
-        descriptions = {
-            "code": "Abre chat de Claude en VSCode",
-            "code dictado": "Abre Claude y empieza a dictar",
-            "dictado": "Empieza a dictar texto",
-            "listo": "Termina y envía el dictado",
-            "cancela": "Cancela sin enviar",
-            "enviar": "Envía el mensaje",
-            "enter": "Confirma / nueva línea",
-            "seleccion": "Selecciona todo el texto",
-            "eliminar": "Borra lo seleccionado",
-            "borra todo": "Borra todo el texto",
-            "escape": "Cierra o cancela",
-            "tab": "Salta al siguiente campo",
-            "aceptar": "Acepta la opción",
-            "copiar": "Copia al portapapeles",
-            "pegar": "Pega del portapapeles",
-            "deshacer": "Deshace el último cambio",
-            "rehacer": "Rehace lo deshecho",
-            "guardar": "Guarda el archivo",
-            "arriba": "Mueve hacia arriba",
-            "abajo": "Mueve hacia abajo",
-            "izquierda": "Mueve a la izquierda",
-            "derecha": "Mueve a la derecha",
-            "inicio": "Va al principio",
-            "fin": "Va al final",
-            "repetir": "Repite el último comando",
-            "ayuda": "Muestra esta ayuda",
-            "pausa": "Pausa el reconocimiento",
-            "reanuda": "Reanuda el reconocimiento",
-            "reiniciar": "Reinicia VoiceFlow",
-        }
-
-        # Recopilar comandos disponibles
-        commands = []
-        seen = set()
+        # Recopilar comandos disponibles (dict: dedup preservando orden)
+        commands = {}
         for cmd in registry._commands:
             if state in cmd.allowed_states:
                 keyword = cmd.keywords[0]
-                if keyword not in seen:
-                    seen.add(keyword)
-                    desc = descriptions.get(keyword, "")
-                    commands.append((keyword, desc))
+                if keyword not in commands:
+                    commands[keyword] = _HELP_DESCRIPTIONS.get(keyword, "")
 
         # Mostrar en overlay si está disponible
         if overlay:
-            overlay.show_help(commands)
+            overlay.show_help(list(commands.items()))
         else:
             # Fallback a consola
-            state_names = {
-                State.IDLE: "IDLE",
-                State.DICTATING: "DICTANDO",
-                State.PROCESSING: "PROCESANDO"
-            }
             print(f"\n{'=' * 40}")
-            print(f"  Comandos disponibles ({state_names.get(state, 'UNKNOWN')})")
+            print(f"  Comandos disponibles ({_STATE_NAMES.get(state, 'UNKNOWN')})")
             print(f"{'=' * 40}")
-            for kw, desc in commands:
+            for kw, desc in commands.items():
                 print(f"  '{kw}' - {desc}")
             print(f"{'=' * 40}\n")
 
     def on_opcion(self, numero: int):
         """Pulsa un numero"""
-        pyautogui.press(str(numero))
+        pyautogui.press(_DIGITOS[numero] if 0 <= numero <= 9 else str(numero))
 
     def on_escape(self):
         """Pulsa Escape"""
         pyautogui.press('escape')
-        self._last_action = self.on_escape
+        self._last_action = (self.on_escape, ())
 
     def on_tab(self):
         """Pulsa Tab"""
         pyautogui.press('tab')
-        self._last_action = self.on_tab
+        self._last_action = (self.on_tab, ())
 
     def on_copiar(self):
         """Ctrl+C"""
         pyautogui.hotkey('ctrl', 'c')
-        self._last_action = self.on_copiar
+        self._last_action = (self.on_copiar, ())
 
     def on_pegar(self):
         """Ctrl+V"""
         pyautogui.hotkey('ctrl', 'v')
-        self._last_action = self.on_pegar
+        self._last_action = (self.on_pegar, ())
 
     def on_deshacer(self):
         """Ctrl+Z"""
         pyautogui.hotkey('ctrl', 'z')
-        self._last_action = self.on_deshacer
+        self._last_action = (self.on_deshacer, ())
 
     def on_rehacer(self):
         """Ctrl+Y"""
         pyautogui.hotkey('ctrl', 'y')
-        self._last_action = self.on_rehacer
+        self._last_action = (self.on_rehacer, ())
 
     def on_guardar(self):
         """Ctrl+S"""
         pyautogui.hotkey('ctrl', 's')
-        self._last_action = self.on_guardar
+        self._last_action = (self.on_guardar, ())
 
     def on_flecha(self, direccion: str):
         """Pulsa una flecha de direccion"""
         pyautogui.press(direccion)
-        self._last_action = lambda: self.on_flecha(direccion)
+        self._last_action = (self.on_flecha, (direccion,))
 
     def on_inicio(self):
         """Pulsa Home"""
         pyautogui.press('home')
-        self._last_action = self.on_inicio
+        self._last_action = (self.on_inicio, ())
 
     def on_fin(self):
         """Pulsa End"""
         pyautogui.press('end')
-        self._last_action = self.on_fin
+        self._last_action = (self.on_fin, ())
 
     def on_repetir(self):
         """Repite la ultima accion"""
         if self._last_action:
-            self._last_action()
+            fn, args = self._last_action
+            fn(*args)
         else:
             print("[INFO] No hay acción anterior para repetir")
 
@@ -518,8 +687,6 @@ if ($hwnd) {
 
     def on_enviar(self, state_machine):
         """Termina dictado y pulsa Enter (listo + enter)"""
-        from core.state import State
-
         # Primero terminar dictado
         self.on_listo()
         state_machine.transition(State.IDLE)
@@ -581,16 +748,17 @@ if ($hwnd) {
         print(f"[Actions] Ejecutando intent: {label} (hotkey: {hotkey})")
 
         try:
-            # 1. Enfocar VS Code
-            self._focus_vscode()
+            # 1. Enfocar VS Code (con hotkey, esperar a que tenga el foco)
+            if hotkey:
+                self._focus_vscode_and_wait(0.2)
+            else:
+                self._focus_vscode()
 
             # 2. Ejecutar hotkey (si existe)
             if hotkey:
-                time.sleep(0.2)
                 if "+" in hotkey:
                     # Combinación de teclas (ej: "ctrl+enter", "alt+1")
-                    keys = hotkey.split("+")
-                    pyautogui.hotkey(*keys)
+                    pyautogui.hotkey(*_parse_hotkey(hotkey))
                 else:
                     # Tecla simple (ej: "enter", "escape", "1", "2", "tab")
                     pyautogui.press(hotkey)
@@ -5,11 +5,41 @@ Ejecuta pipelines de acciones sobre páginas web usando Playwright.
 Soporta: connect, find_tab, wait_for, fill, click, paste, press.
 """
 
+import logging
+import time
 from typing import Optional
 import pyperclip
 
+from core import win32
 from .browser_manager import BrowserManager
 
+logger = logging.getLogger("voiceflow.browser")
+
+# Selector de los mensajes (turnos) de una conversación de ChatGPT
+TURN_SELECTOR = '[data-testid^="conversation-turn"]'
+
+# Botón "Más acciones" de un mensaje (aparece cuando la respuesta terminó)
+MENU_BUTTON_SELECTOR = 'button[aria-label="Más acciones"]'
+
+# Predicado evaluado dentro de la página: hay al menos 2 mensajes nuevos
+# (el nuestro + la respuesta) y el último tiene el botón del menú
+# (respuesta completa). Devuelve el total de mensajes o 0 si aún no.
+# Los selectores llegan como argumento (ver _do_wait_for_new_message) para
+# no repetir las constantes de arriba.
+NEW_MESSAGE_JS = """({prev, turnSel, menuSel}) => {
+    const turns = document.querySelectorAll(turnSel);
+    if (turns.length < prev + 2) return 0;
+    const last = turns[turns.length - 1];
+    return last.querySelector(menuSel) ? turns.length : 0;
+}"""
+
+
+def _clipboard_text() -> str:
+    """Texto del portapapeles (ctypes en Windows, pyperclip en el resto)."""
+    if win32.AVAILABLE:
+        return win32.paste_text()
+    return pyperclip.paste() or ""
+
 
 class BrowserActionExecutor:
     """
@@ -32,8 +62,28 @@ class BrowserActionExecutor:
     def __init__(self):
         self.manager = BrowserManager.get_instance()
         self.current_page = None
+        self._turns_loc = None  # Locator de TURN_SELECTOR para current_page
         self.message_count_before = 0  # Para tracking de mensajes nuevos
         self.last_error = None  # Último error descriptivo
+        # Tabla de despacho: action -> handler (se construye una sola vez)
+        self._dispatch = {
+            "connect": self._do_connect,
+            "find_tab": self._do_find_tab,
+            "wait_for": self._do_wait_for,
+            "fill": self._do_fill,
+            "click": self._do_click,
+            "paste": self._do_paste,
+            "press": self._do_press,
+            "clear": self._do_clear,
+            "clear_textarea": self._do_clear_textarea,
+            "wait": self._do_wait,
+            "focus_window": self._do_focus_window,
+            "count_messages": self._do_count_messages,
+            "wait_for_new_message": self._do_wait_for_new_message,
+            "click_last_menu_item": self._do_click_last_menu_item,
+            "wait_for_idle": self._do_wait_for_idle,
+            "click_menu_item": self._do_click_menu_item,
+        }
 
     def execute(self, actions: list, command_name: str = "browser") -> bool:
         """
@@ -49,246 +99,251 @@ class BrowserActionExecutor:
         for i, action in enumerate(actions):
             action_type = action.get("action", "unknown")
             try:
-                print(f"[Browser] {command_name} - paso {i+1}: {action_type}")
+                logger.info(f"[Browser] {command_name} - paso {i+1}: {action_type}")
                 success = self._execute_one(action)
                 if not success:
-                    print(f"[Browser] Acción '{action_type}' falló")
+                    logger.warning(f"[Browser] Acción '{action_type}' falló")
                     return False
             except Exception as e:
-                print(f"[Browser] ERROR en paso {i+1} ({action_type}): {e}")
+                logger.error(f"[Browser] ERROR en paso {i+1} ({action_type}): {e}")
                 return False
         return True
 
     def _execute_one(self, action: dict) -> bool:
         """Ejecuta una sola acción."""
-        action_type = action.get("action")
-
-        if action_type == "connect":
-            port = action.get("port", 9222)
-            return self.manager.connect(port)
-
-        elif action_type == "find_tab":
-            url_contains = action.get("url_contains", "")
-            self.current_page = self.manager.find_tab(url_contains)
-            if not self.current_page:
-                # Mensaje de error específico según la URL buscada
-                if "chatgpt" in url_contains.lower() or "chat.openai" in url_contains.lower():
-                    self.last_error = "ChatGPT no está listo. Abre chat.openai.com en Edge."
-                elif "claude" in url_contains.lower():
-                    self.last_error = "Claude no está listo. Abre claude.ai en Edge."
-                else:
-                    self.last_error = f"No se encontró pestaña con '{url_contains}' en Edge."
-                print(f"[Browser] {self.last_error}")
-                return False
-            self.current_page.bring_to_front()
+        handler = self._dispatch.get(action.get("action"))
+        if handler is None:
+            return self._unknown(action)
+        return handler(action)
+
+    def _unknown(self, action: dict) -> bool:
+        """Acción no registrada en la tabla de despacho."""
+        logger.warning(f"[Browser] Acción desconocida: {action.get('action')}")
+        return False
+
+    def _do_connect(self, action: dict) -> bool:
+        port = action.get("port", 9222)
+        return self.manager.connect(port)
+
+    def _do_find_tab(self, action: dict) -> bool:
+        url_contains = action.get("url_contains", "")
+        self.current_page = self.manager.find_tab(url_contains)
+        if not self.current_page:
+            # Mensaje de error específico según la URL buscada
+            if "chatgpt" in url_contains.lower() or "chat.openai" in url_contains.lower():
+                self.last_error = "ChatGPT no está listo. Abre chat.openai.com en Edge."
+            elif "claude" in url_contains.lower():
+                self.last_error = "Claude no está listo. Abre claude.ai en Edge."
+            else:
+                self.last_error = f"No se encontró pestaña con '{url_contains}' en Edge."
+            logger.warning(f"[Browser] {self.last_error}")
+            return False
+        # Locator reutilizable: se resuelve en el navegador en cada uso
+        self._turns_loc = self.current_page.locator(TURN_SELECTOR)
+        self.current_page.bring_to_front()
+        return True
+
+    def _do_wait_for(self, action: dict) -> bool:
+        if not self.current_page:
+            logger.warning("[Browser] No hay página activa")
+            return False
+        selector = action.get("selector", "")
+        timeout = action.get("timeout", 5) * 1000  # segundos a ms
+        try:
+            self.current_page.wait_for_selector(selector, timeout=timeout)
             return True
+        except Exception as e:
+            logger.warning(f"[Browser] Timeout esperando '{selector}': {e}")
+            return False
 
-        elif action_type == "wait_for":
-            if not self.current_page:
-                print("[Browser] No hay página activa")
-                return False
-            selector = action.get("selector", "")
-            timeout = action.get("timeout", 5) * 1000  # segundos a ms
-            try:
-                self.current_page.wait_for_selector(selector, timeout=timeout)
-                return True
-            except Exception as e:
-                print(f"[Browser] Timeout esperando '{selector}': {e}")
-                return False
+    def _do_fill(self, action: dict) -> bool:
+        if not self.current_page:
+            return False
+        selector = action.get("selector", "")
+        text = action.get("text", "")
+        # Interpolar {clipboard} (solo se lee el portapapeles si hace falta)
+        if "{clipboard}" in text:
+            text = text.replace("{clipboard}", _clipboard_text())
+        self.current_page.fill(selector, text)
+        return True
 
-        elif action_type == "fill":
-            if not self.current_page:
-                return False
-            selector = action.get("selector", "")
-            text = action.get("text", "")
-            # Interpolar {clipboard}
-            text = text.replace("{clipboard}", pyperclip.paste() or "")
-            self.current_page.fill(selector, text)
-            return True
+    def _do_click(self, action: dict) -> bool:
+        if not self.current_page:
+            return False
+        selector = action.get("selector", "")
+        self.current_page.click(selector)
+        return True
 
-        elif action_type == "click":
-            if not self.current_page:
-                return False
-            selector = action.get("selector", "")
-            self.current_page.click(selector)
-            return True
+    def _do_paste(self, action: dict) -> bool:
+        if not self.current_page:
+            return False
+        selector = action.get("selector", "")
+        content = _clipboard_text()
+        if not content:
+            logger.warning("[Browser] Clipboard vacío")
+            return False
+        # Enfocar elemento y escribir
+        element = self.current_page.locator(selector)
+        element.focus()
+        self.current_page.keyboard.insert_text(content)
+        return True
 
-        elif action_type == "paste":
-            if not self.current_page:
-                return False
-            selector = action.get("selector", "")
-            content = pyperclip.paste() or ""
-            if not content:
-                print("[Browser] Clipboard vacío")
-                return False
-            # Enfocar elemento y escribir
-            element = self.current_page.locator(selector)
-            element.focus()
-            self.current_page.keyboard.insert_text(content)
-            return True
+    def _do_press(self, action: dict) -> bool:
+        if not self.current_page:
+            return False
+        key = action.get("key", "Enter")
+        self.current_page.keyboard.press(key)
+        return True
 
-        elif action_type == "press":
-            if not self.current_page:
-                return False
-            key = action.get("key", "Enter")
-            self.current_page.keyboard.press(key)
-            return True
+    def _do_clear(self, action: dict) -> bool:
+        if not self.current_page:
+            return False
+        selector = action.get("selector", "")
+        # Triple click para seleccionar todo + delete
+        self.current_page.click(selector, click_count=3)
+        self.current_page.keyboard.press("Delete")
+        return True
 
-        elif action_type == "clear":
-            if not self.current_page:
-                return False
-            selector = action.get("selector", "")
-            # Triple click para seleccionar todo + delete
-            self.current_page.click(selector, click_count=3)
+    def _do_clear_textarea(self, action: dict) -> bool:
+        """Limpia un textarea usando Ctrl+A + Delete"""
+        if not self.current_page:
+            return False
+        selector = action.get("selector", "")
+        try:
+            element = self.current_page.locator(selector).first
+            element.click()
+            self.current_page.keyboard.press("Control+a")
             self.current_page.keyboard.press("Delete")
             return True
+        except Exception as e:
+            logger.error(f"[Browser] Error limpiando textarea: {e}")
+            return False
 
-        elif action_type == "clear_textarea":
-            # Limpia un textarea usando Ctrl+A + Delete
-            if not self.current_page:
-                return False
-            selector = action.get("selector", "")
-            try:
-                element = self.current_page.locator(selector).first
-                element.click()
-                self.current_page.keyboard.press("Control+a")
-                self.current_page.keyboard.press("Delete")
-                return True
-            except Exception as e:
-                print(f"[Browser] Error limpiando textarea: {e}")
-                return False
-
-        elif action_type == "wait":
-            import time
-            seconds = action.get("seconds", 0.5)
-            time.sleep(seconds)
-            return True
+    def _do_wait(self, action: dict) -> bool:
+        seconds = action.get("seconds", 0.5)
+        time.sleep(seconds)
+        return True
 
-        elif action_type == "focus_window":
-            # Trae la ventana del navegador al frente
-            try:
+    def _do_focus_window(self, action: dict) -> bool:
+        """Trae la ventana del navegador al frente"""
+        # Buscar por título (Edge, Chrome, etc.)
+        title = action.get("title", "Edge")
+        try:
+            if win32.AVAILABLE:
+                # EnumWindows directo, sin importar pygetwindow
+                activated = win32.activate_by_title_contains(title)
+            else:
                 import pygetwindow as gw
-                # Buscar por título (Edge, Chrome, etc.)
-                title = action.get("title", "Edge")
                 windows = gw.getWindowsWithTitle(title)
+                activated = None
                 if windows:
                     win = windows[0]
                     if win.isMinimized:
                         win.restore()
                     win.activate()
-                    print(f"[Browser] Ventana activada: {win.title[:50]}")
-                    return True
-                else:
-                    print(f"[Browser] No se encontró ventana con título '{title}'")
-                    return False
-            except Exception as e:
-                print(f"[Browser] Error activando ventana: {e}")
-                return False
-
-        elif action_type == "count_messages":
-            # Guarda el número actual de mensajes para detectar nuevos
-            if not self.current_page:
-                return False
-            try:
-                turns = self.current_page.locator('[data-testid^="conversation-turn"]').all()
-                self.message_count_before = len(turns)
-                print(f"[Browser] Mensajes actuales: {self.message_count_before}")
+                    activated = win.title
+            if activated is not None:
+                logger.info(f"[Browser] Ventana activada: {activated[:50]}")
                 return True
-            except Exception as e:
-                print(f"[Browser] Error contando mensajes: {e}")
+            else:
+                logger.warning(f"[Browser] No se encontró ventana con título '{title}'")
                 return False
-
-        elif action_type == "wait_for_new_message":
-            # Espera hasta que aparezca un mensaje nuevo (respuesta de ChatGPT)
-            if not self.current_page:
-                return False
-            timeout = action.get("timeout", 120)
-            import time
-            start_time = time.time()
-
-            while time.time() - start_time < timeout:
-                try:
-                    turns = self.current_page.locator('[data-testid^="conversation-turn"]').all()
-                    current_count = len(turns)
-
-                    # Necesitamos al menos 2 mensajes nuevos (el nuestro + la respuesta)
-                    if current_count >= self.message_count_before + 2:
-                        # Verificar que el último mensaje tiene el botón "Más acciones" (respuesta completa)
-                        last_turn = turns[-1]
-                        more_actions = last_turn.locator('button[aria-label="Más acciones"]')
-                        if more_actions.count() > 0:
-                            print(f"[Browser] Mensaje nuevo detectado (total: {current_count})")
-                            return True
-
-                    time.sleep(0.5)
-                except Exception:
-                    time.sleep(0.5)
-
-            print(f"[Browser] Timeout esperando mensaje nuevo")
+        except Exception as e:
+            logger.error(f"[Browser] Error activando ventana: {e}")
             return False
 
-        elif action_type == "click_last_menu_item":
-            # Click en un item del menú del ÚLTIMO mensaje
-            if not self.current_page:
-                return False
-            menu_button = action.get("menu_button", "Más acciones")
-            item_text = action.get("item_text", "")
-            try:
-                # Obtener el último conversation-turn
-                last_turn = self.current_page.locator('[data-testid^="conversation-turn"]').last
-
-                # Click en el botón del menú dentro de ese turn
-                btn = last_turn.locator(f'button[aria-label="{menu_button}"]')
-                btn.click()
-
-                import time
-                time.sleep(0.3)
+    def _do_count_messages(self, action: dict) -> bool:
+        """Guarda el número actual de mensajes para detectar nuevos"""
+        if not self.current_page:
+            return False
+        try:
+            self.message_count_before = self._turns_loc.count()
+            logger.info(f"[Browser] Mensajes actuales: {self.message_count_before}")
+            return True
+        except Exception as e:
+            logger.error(f"[Browser] Error contando mensajes: {e}")
+            return False
 
-                # Click en el item del menú
-                menu_item = self.current_page.locator(f'[role="menuitem"]:has-text("{item_text}")')
-                menu_item.click()
-                print(f"[Browser] Clicked en último mensaje: {menu_button} -> {item_text}")
-                return True
-            except Exception as e:
-                print(f"[Browser] Error en menú del último mensaje: {e}")
-                return False
+    def _do_wait_for_new_message(self, action: dict) -> bool:
+        """Espera hasta que aparezca un mensaje nuevo (respuesta de ChatGPT)"""
+        if not self.current_page:
+            return False
+        timeout = action.get("timeout", 120)
+        try:
+            # El navegador evalúa el predicado (cada 100 ms, también con la
+            # pestaña en segundo plano) sin ida y vuelta por CDP en cada tick
+            handle = self.current_page.wait_for_function(
+                NEW_MESSAGE_JS,
+                arg={
+                    "prev": self.message_count_before,
+                    "turnSel": TURN_SELECTOR,
+                    "menuSel": MENU_BUTTON_SELECTOR,
+                },
+                polling=100,
+                timeout=timeout * 1000
+            )
+            logger.info(f"[Browser] Mensaje nuevo detectado (total: {handle.json_value()})")
+            return True
+        except Exception as e:
+            logger.warning(f"[Browser] Timeout esperando mensaje nuevo: {e}")
+            return False
 
-        elif action_type == "wait_for_idle":
-            # DEPRECATED: usar count_messages + wait_for_new_message
-            if not self.current_page:
-                return False
-            timeout = action.get("timeout", 60) * 1000
-            try:
-                self.current_page.wait_for_selector(
-                    'button[aria-label="Más acciones"]',
-                    timeout=timeout,
-                    state="visible"
-                )
-                print("[Browser] ChatGPT terminó de responder")
-                return True
-            except Exception as e:
-                print(f"[Browser] Timeout esperando respuesta: {e}")
-                return False
+    def _do_click_last_menu_item(self, action: dict) -> bool:
+        """Click en un item del menú del ÚLTIMO mensaje"""
+        if not self.current_page:
+            return False
+        menu_button = action.get("menu_button", "Más acciones")
+        item_text = action.get("item_text", "")
+        try:
+            # Obtener el último conversation-turn
+            last_turn = self._turns_loc.last
+
+            # Click en el botón del menú dentro de ese turn
+            btn = last_turn.locator(f'button[aria-label="{menu_button}"]')
+            btn.click()
+
+            time.sleep(0.3)
+
+            # Click en el item del menú
+            menu_item = self.current_page.locator(f'[role="menuitem"]:has-text("{item_text}")')
+            menu_item.click()
+            logger.info(f"[Browser] Clicked en último mensaje: {menu_button} -> {item_text}")
+            return True
+        except Exception as e:
+            logger.error(f"[Browser] Error en menú del último mensaje: {e}")
+            return False
 
-        elif action_type == "click_menu_item":
-            # DEPRECATED: usar click_last_menu_item
-            if not self.current_page:
-                return False
-            menu_button = action.get("menu_button", "")
-            item_text = action.get("item_text", "")
-            try:
-                btn = self.current_page.locator(f'button[aria-label="{menu_button}"]').last
-                btn.click()
-                import time
-                time.sleep(0.3)
-                menu_item = self.current_page.locator(f'[role="menuitem"]:has-text("{item_text}")')
-                menu_item.click()
-                print(f"[Browser] Clicked: {menu_button} -> {item_text}")
-                return True
-            except Exception as e:
-                print(f"[Browser] Error en menú: {e}")
-                return False
+    def _do_wait_for_idle(self, action: dict) -> bool:
+        """DEPRECATED: usar count_messages + wait_for_new_message"""
+        if not self.current_page:
+            return False
+        timeout = action.get("timeout", 60) * 1000
+        try:
+            self.current_page.wait_for_selector(
+                MENU_BUTTON_SELECTOR,
+                timeout=timeout,
+                state="visible"
+            )
+            logger.info("[Browser] ChatGPT terminó de responder")
+            return True
+        except Exception as e:
+            logger.warning(f"[Browser] Timeout esperando respuesta: {e}")
+            return False
 
-        else:
-            print(f"[Browser] Acción desconocida: {action_type}")
+    def _do_click_menu_item(self, action: dict) -> bool:
+        """DEPRECATED: usar click_last_menu_item"""
+        if not self.current_page:
+            return False
+        menu_button = action.get("menu_button", "")
+        item_text = action.get("item_text", "")
+        try:
+            btn = self.current_page.locator(f'button[aria-label="{menu_button}"]').last
+            btn.click()
+            time.sleep(0.3)
+            menu_item = self.current_page.locator(f'[role="menuitem"]:has-text("{item_text}")')
+            menu_item.click()
+            logger.info(f"[Browser] Clicked: {menu_button} -> {item_text}")
+            return True
+        except Exception as e:
+            logger.error(f"[Browser] Error en menú: {e}")
             return False
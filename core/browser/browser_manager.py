@@ -5,6 +5,9 @@ Permite conectarse a un Chrome existente via Chrome DevTools Protocol
 y encontrar pestañas específicas por URL.
 """
 
+import logging
+import threading
+import time
 from typing import Optional
 
 try:
@@ -15,6 +18,11 @@ except ImportError:
     Browser = None
     Page = None
 
+# Esperas entre reintentos de connect_over_cdp (segundos)
+CDP_RETRY_DELAYS = (0.05, 0.1, 0.2)
+
+logger = logging.getLogger("voiceflow.browser")
+
 
 class BrowserManager:
     """
@@ -29,10 +37,15 @@ class BrowserManager:
     _instance: Optional['BrowserManager'] = None
     _browser: Optional[Browser] = None
     _playwright = None
+    _lock = threading.Lock()            # Creación del singleton
+    _conn_lock = threading.RLock()      # connect/disconnect/shutdown
 
     def __new__(cls):
+        # Double-checked: sin lock en el caso habitual (ya creada)
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
 
     @classmethod
@@ -53,23 +66,37 @@ class BrowserManager:
             True si la conexión fue exitosa
         """
         if not PLAYWRIGHT_AVAILABLE:
-            print("[Browser] Playwright no instalado. Ejecuta: pip install playwright && playwright install chromium")
+            logger.warning("[Browser] Playwright no instalado. Ejecuta: pip install playwright && playwright install chromium")
             return False
 
-        if self._browser:
-            return True
-
-        try:
-            self._playwright = sync_playwright().start()
-            self._browser = self._playwright.chromium.connect_over_cdp(
-                f"http://localhost:{port}"
-            )
-            print(f"[Browser] Conectado a Chrome en puerto {port}")
-            return True
-        except Exception as e:
-            print(f"[Browser] Error conectando a Chrome: {e}")
-            print(f"[Browser] Asegúrate de lanzar Chrome con: --remote-debugging-port={port}")
-            return False
+        # Un solo hilo conecta; los demás ven la conexión ya hecha
+        with self._conn_lock:
+            if self._browser:
+                return True
+
+            try:
+                # El driver de Playwright (proceso Node) se arranca una sola vez y
+                # se reutiliza entre reconexiones; solo shutdown() lo detiene
+                if self._playwright is None:
+                    self._playwright = sync_playwright().start()
+
+                endpoint = f"http://localhost:{port}"
+                for delay in CDP_RETRY_DELAYS:
+                    try:
+                        self._browser = self._playwright.chromium.connect_over_cdp(endpoint)
+                        break
+                    except Exception:
+                        # Handshake CDP fallido: reintentar sin reiniciar el driver
+                        time.sleep(delay)
+                else:
+                    self._browser = self._playwright.chromium.connect_over_cdp(endpoint)
+
+                logger.info(f"[Browser] Conectado a Chrome en puerto {port}")
+                return True
+            except Exception as e:
+                logger.error(f"[Browser] Error conectando a Chrome: {e}")
+                logger.error(f"[Browser] Asegúrate de lanzar Chrome con: --remote-debugging-port={port}")
+                return False
 
     def find_tab(self, url_contains: str) -> Optional[Page]:
         """
@@ -82,16 +109,21 @@ class BrowserManager:
             Page si se encuentra, None si no
         """
         if not self._browser:
-            print("[Browser] No conectado. Llama connect() primero.")
+            logger.warning("[Browser] No conectado. Llama connect() primero.")
             return None
 
+        # page.url es un atributo local de Playwright (se actualiza con los
+        # eventos de navegación), así que no hace falta cachearlo; solo se
+        # evita recalcular el patrón en cada pestaña
+        needle = url_contains.casefold()
         for context in self._browser.contexts:
             for page in context.pages:
-                if url_contains.lower() in page.url.lower():
-                    print(f"[Browser] Encontrada pestaña: {page.url[:60]}...")
+                url = page.url
+                if needle in url.casefold():
+                    logger.info(f"[Browser] Encontrada pestaña: {url[:60]}...")
                     return page
 
-        print(f"[Browser] No se encontró pestaña con '{url_contains}'")
+        logger.info(f"[Browser] No se encontró pestaña con '{url_contains}'")
         return None
 
     def get_all_tabs(self) -> list:
@@ -110,19 +142,25 @@ class BrowserManager:
         return self._browser is not None
 
     def disconnect(self):
-        """Cierra la conexión CDP."""
-        if self._browser:
-            try:
-                self._browser.close()
-            except Exception:
-                pass
-            self._browser = None
-
-        if self._playwright:
-            try:
-                self._playwright.stop()
-            except Exception:
-                pass
-            self._playwright = None
-
-        print("[Browser] Desconectado")
+        """Cierra la conexión CDP (el driver de Playwright sigue vivo)."""
+        with self._conn_lock:
+            if self._browser:
+                try:
+                    self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+
+        logger.info("[Browser] Desconectado")
+
+    def shutdown(self):
+        """Cierra la conexión y detiene el driver de Playwright (al salir)."""
+        with self._conn_lock:
+            self.disconnect()
+
+            if self._playwright:
+                try:
+                    self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
@@ -4,8 +4,13 @@ BrowserLauncher - Helper para lanzar navegadores Chromium con debugging.
 Soporta Chrome, Edge y Chromium con --remote-debugging-port para CDP.
 """
 
+import socket
+import struct
 import subprocess
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple
 
 # Rutas conocidas de navegadores en Windows
@@ -25,6 +30,12 @@ BROWSER_PATHS = {
 }
 
 
+# Último chequeo positivo por puerto (time.monotonic()); evita reconectar
+# en bucles que esperan a que el navegador arranque
+_DEBUG_OK_TTL = 0.5
+_debug_ok_at: dict = {}
+
+
 def find_browser(preferred: str = "auto") -> Tuple[Optional[str], str]:
     """
     Busca un navegador Chromium instalado.
@@ -41,11 +52,26 @@ def find_browser(preferred: str = "auto") -> Tuple[Optional[str], str]:
     else:
         search_order = [preferred]
 
-    for browser_name in search_order:
-        paths = BROWSER_PATHS.get(browser_name, [])
-        for path in paths:
-            if os.path.exists(path):
+    # Candidatos en orden de preferencia
+    candidates = [
+        (browser_name, path)
+        for browser_name in search_order
+        for path in BROWSER_PATHS.get(browser_name, [])
+    ]
+    if not candidates:
+        return None, ""
+
+    # Los stat se lanzan en paralelo (Program Files puede estar en una unidad
+    # lenta); se recorren en orden y se devuelve el primero que exista sin
+    # esperar al resto
+    pool = ThreadPoolExecutor(max_workers=len(candidates))
+    try:
+        futures = [pool.submit(os.path.exists, path) for _, path in candidates]
+        for (browser_name, path), future in zip(candidates, futures):
+            if future.result():
                 return path, browser_name
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
     return None, ""
 
@@ -90,8 +116,20 @@ def launch_browser_debug(
         f"--user-data-dir={user_data_dir}",
     ]
 
+    # Proceso desacoplado: sin heredar la consola ni nuestros handles de stdio
+    creationflags = 0
+    if sys.platform == "win32":
+        creationflags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+
     try:
-        subprocess.Popen(args)
+        subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            creationflags=creationflags
+        )
         print(f"[Browser] {browser_name.capitalize()} iniciado con puerto {port}")
         print(f"[Browser] Perfil: {user_data_dir}")
         return True
@@ -115,21 +153,28 @@ def is_chrome_debug_running(port: int = 9222) -> bool:
     Returns:
         True si Chrome está disponible
     """
-    import socket
+    now = time.monotonic()
+    if now - _debug_ok_at.get(port, float("-inf")) < _DEBUG_OK_TTL:
+        return True
 
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        result = sock.connect_ex(('localhost', port))
-        sock.close()
-        return result == 0
-    except Exception:
+        # IPv4 literal: sin resolver "localhost" (el DevTools escucha en 127.0.0.1)
+        sock = socket.create_connection(("127.0.0.1", port), timeout=0.1)
+    except OSError:
         return False
 
+    # SO_LINGER 0: cierre con RST, sin dejar sockets en TIME_WAIT al sondear
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    except OSError:
+        pass
+    sock.close()
+    _debug_ok_at[port] = now
+    return True
+
 
 if __name__ == "__main__":
     # Uso directo: python chrome_launcher.py [browser]
-    import sys
     browser = sys.argv[1] if len(sys.argv) > 1 else "auto"
 
     if is_chrome_debug_running():
@@ -5,7 +5,9 @@ Monitors config/commands/ directory for JSON file changes and
 automatically reloads commands without restarting the application.
 """
 
+import logging
 import os
+import sys
 import threading
 import time
 from dataclasses import dataclass, field
@@ -17,6 +19,46 @@ if TYPE_CHECKING:
     from core.sounds import SoundPlayer
 
 
+logger = logging.getLogger("voiceflow.watcher")
+
+
+# Filesystems where native change notifications are unreliable
+_REMOTE_FS_TYPES = frozenset({
+    "nfs", "nfs4", "cifs", "smbfs", "smb3", "9p", "afs", "fuse.sshfs", "sshfs",
+})
+
+
+def _is_remote_path(path: str) -> bool:
+    """
+    Best-effort check for a network mount (SMB share, mapped drive, NFS...).
+
+    Native watchers (ReadDirectoryChangesW/inotify) miss events there, so the
+    watcher falls back to polling for those paths.
+    """
+    if sys.platform == "win32":
+        if path.startswith("\\\\"):
+            return True  # UNC path
+        import ctypes
+        drive = os.path.splitdrive(path)[0]
+        if not drive:
+            return False
+        DRIVE_REMOTE = 4
+        return ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+
+    # POSIX: fstype of the longest matching mount point in /proc/mounts
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    best_point, best_type = "", ""
+    for point, fstype in mounts:
+        point = point.replace("\\040", " ")
+        if (path == point or path.startswith(point.rstrip("/") + "/")) and len(point) > len(best_point):
+            best_point, best_type = point, fstype
+    return best_type in _REMOTE_FS_TYPES
+
+
 @dataclass
 class ReloadResult:
     """Result of a command reload operation."""
@@ -67,15 +109,31 @@ class CommandWatcher:
         self._debounce_seconds = debounce_seconds
 
         self._observer = None
-        self._debounce_timer: Optional[threading.Timer] = None
         self._lock = threading.Lock()
         self._running = False
 
+        # Debounce: a single worker thread waits until the deadline stops
+        # moving, instead of spawning a threading.Timer per event
+        self._cond = threading.Condition(self._lock)
+        self._next_fire: Optional[float] = None  # time.monotonic() deadline
+        self._debounce_thread: Optional[threading.Thread] = None
+
+        # (st_mtime_ns, st_size) per JSON file as of the last reload; events
+        # that leave a file's signature unchanged don't trigger a reload
+        self._file_stats: dict[str, tuple[int, int]] = {}
+
+        # Incremental reload: commands per JSON file as of the last full
+        # reload (None until the first one), and the files touched since
+        self._file_commands: Optional[dict[str, list]] = None
+        self._pending_names: set[str] = set()
+        self._full_reload_pending = False
+
         # Hot reload config
         hr_config = config.get("custom_commands", {}).get("hot_reload", {})
         self._notify_on_reload = hr_config.get("notify_on_reload", True)
         self._sound_on_success = hr_config.get("sound_on_success", "ding")
         self._sound_on_error = hr_config.get("sound_on_error", "error")
+        self._force_polling = hr_config.get("force_polling", False)
 
     def start(self) -> bool:
         """
@@ -86,9 +144,9 @@ class CommandWatcher:
         """
         try:
             from watchdog.observers import Observer
-            from watchdog.events import FileSystemEventHandler, FileSystemEvent
+            from watchdog.events import PatternMatchingEventHandler, FileSystemEvent
         except ImportError:
-            print("[CommandWatcher] watchdog not installed, hot reload disabled")
+            logger.warning("[CommandWatcher] watchdog not installed, hot reload disabled")
             return False
 
         if self._running:
@@ -97,26 +155,43 @@ class CommandWatcher:
         # Create event handler
         watcher = self
 
-        class JsonFileHandler(FileSystemEventHandler):
+        class JsonFileHandler(PatternMatchingEventHandler):
             def on_any_event(self, event: FileSystemEvent):
-                # Only react to JSON files
-                if event.is_directory:
-                    return
-                path = event.src_path
-                if not path.endswith(".json"):
-                    return
-                # Ignore underscore-prefixed files
-                basename = os.path.basename(path)
-                if basename.startswith("_"):
-                    return
-                watcher._on_file_change(event)
+                # Editors fire several events per save; only real changes count
+                paths = [event.src_path]
+                if getattr(event, "dest_path", ""):
+                    paths.append(event.dest_path)
+                if any(watcher._file_changed(path) for path in paths):
+                    watcher._on_file_change(event)
+
+        # Only JSON files, ignoring underscore-prefixed ones (non-recursive,
+        # so the ignore pattern is anchored to the commands dir)
+        handler = JsonFileHandler(
+            patterns=["*.json"],
+            ignore_patterns=[os.path.join(self._commands_dir, "_*")],
+            ignore_directories=True
+        )
 
-        self._observer = Observer()
-        self._observer.schedule(JsonFileHandler(), self._commands_dir, recursive=False)
+        self._file_stats = self._snapshot_stats()
+        if self._force_polling or _is_remote_path(self._commands_dir):
+            # Network mounts don't deliver native events reliably
+            from watchdog.observers.polling import PollingObserver
+            self._observer = PollingObserver(timeout=2.0)
+            logger.info("[CommandWatcher] Using polling observer")
+        else:
+            self._observer = Observer()
+        self._observer.schedule(handler, self._commands_dir, recursive=False)
         self._observer.start()
         self._running = True
 
-        print(f"[CommandWatcher] Monitoring {self._commands_dir} for changes")
+        self._debounce_thread = threading.Thread(
+            target=self._debounce_loop,
+            name="CommandWatcherDebounce",
+            daemon=True
+        )
+        self._debounce_thread.start()
+
+        logger.info(f"[CommandWatcher] Monitoring {self._commands_dir} for changes")
         return True
 
     def stop(self) -> None:
@@ -125,14 +200,17 @@ class CommandWatcher:
             self._observer.stop()
             self._observer.join(timeout=2.0)
             self._observer = None
-            self._running = False
-            print("[CommandWatcher] Stopped")
 
-        # Cancel any pending debounce timer
-        with self._lock:
-            if self._debounce_timer:
-                self._debounce_timer.cancel()
-                self._debounce_timer = None
+            # Wake the debounce worker so it exits (pending reload is dropped)
+            with self._cond:
+                self._running = False
+                self._next_fire = None
+                self._cond.notify_all()
+            if self._debounce_thread:
+                self._debounce_thread.join(timeout=2.0)
+                self._debounce_thread = None
+
+            logger.info("[CommandWatcher] Stopped")
 
     def reload(self) -> ReloadResult:
         """
@@ -143,13 +221,17 @@ class CommandWatcher:
         Returns:
             ReloadResult with success status, counts, and any errors
         """
-        print("[CommandWatcher] Reloading custom commands...")
+        logger.info("[CommandWatcher] Reloading custom commands...")
+
+        # Taken before loading so a write during the load is seen as a change
+        self._file_stats = self._snapshot_stats()
 
         # Create a fresh loader
         loader = self._loader_factory()
 
         # Load and validate all commands without registering
-        commands, errors, files = loader.load_all_validated()
+        by_file, errors, files = loader.load_all_by_file()
+        commands = [cmd for cmds in by_file.values() for cmd in cmds]
 
         if not commands and errors:
             # All files failed - keep existing commands
@@ -163,9 +245,52 @@ class CommandWatcher:
             self._notify_result(result)
             return result
 
-        # Atomic swap: unregister old, register new
-        removed = self._registry.unregister_by_source("custom")
-        loaded = self._registry.register_batch(commands, "custom")
+        self._file_commands = {os.path.basename(path): cmds for path, cmds in by_file.items()}
+        return self._swap_commands(commands, errors, files)
+
+    def _reload_files(self, names: set[str]) -> ReloadResult:
+        """
+        Re-parse only the given JSON files and merge them into the last set.
+
+        Deleted files drop their commands; files that fail to load keep
+        the commands from their previous version.
+        """
+        logger.info(f"[CommandWatcher] Reloading {len(names)} changed file(s)...")
+
+        self._file_stats = self._snapshot_stats()
+
+        loader = self._loader_factory()
+        paths = {name: os.path.join(self._commands_dir, name) for name in sorted(names)}
+        existing = [path for path in paths.values() if os.path.isfile(path)]
+        by_file, errors = loader.load_files(existing)
+
+        if existing and not by_file:
+            # Every changed file failed - keep existing commands
+            result = ReloadResult(
+                success=False,
+                commands_loaded=0,
+                commands_removed=0,
+                errors=errors,
+                files_processed=existing
+            )
+            self._notify_result(result)
+            return result
+
+        file_commands = dict(self._file_commands)
+        for name, path in paths.items():
+            if path in by_file:
+                file_commands[name] = by_file[path]
+            elif path not in existing:
+                file_commands.pop(name, None)  # Deleted or renamed away
+        self._file_commands = file_commands
+
+        commands = [cmd for cmds in file_commands.values() for cmd in cmds]
+        return self._swap_commands(commands, errors, existing)
+
+    def _swap_commands(self, commands: list, errors: list[str], files: list[str]) -> ReloadResult:
+        """Replace every custom command in the registry and report the result."""
+        # Atomic swap: old custom commands out, new ones in, in one step
+        removed, loaded = self._registry.replace_source("custom", commands)
 
         result = ReloadResult(
             success=True,
@@ -178,26 +303,73 @@ class CommandWatcher:
         self._notify_result(result)
         return result
 
+    def _snapshot_stats(self) -> dict[str, tuple[int, int]]:
+        """Current (st_mtime_ns, st_size) of each watched JSON file, by name."""
+        stats: dict[str, tuple[int, int]] = {}
+        try:
+            with os.scandir(self._commands_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.endswith(".json") or name.startswith("_"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    stats[name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        return stats
+
+    def _file_changed(self, path) -> bool:
+        """True if the file differs from the last snapshot (incl. created/deleted)."""
+        path = os.fsdecode(path)
+        try:
+            st = os.stat(path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        return self._file_stats.get(os.path.basename(path)) != signature
+
     def _on_file_change(self, event) -> None:
         """Handler called by watchdog on file system events."""
-        with self._lock:
-            # Cancel existing timer
-            if self._debounce_timer:
-                self._debounce_timer.cancel()
-
-            # Start new debounce timer
-            self._debounce_timer = threading.Timer(
-                self._debounce_seconds,
-                self._debounced_reload
-            )
-            self._debounce_timer.start()
-
-    def _debounced_reload(self) -> None:
-        """Called after debounce period expires."""
-        with self._lock:
-            self._debounce_timer = None
-
-        self.reload()
+        with self._cond:
+            if event is None:
+                self._full_reload_pending = True
+            else:
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    name = os.path.basename(os.fsdecode(path))
+                    if name.endswith(".json") and not name.startswith("_"):
+                        self._pending_names.add(name)
+            # Push the deadline back; the worker reloads once it expires
+            self._next_fire = time.monotonic() + self._debounce_seconds
+            self._cond.notify()
+
+    def _debounce_loop(self) -> None:
+        """Worker thread: reloads once no events arrived for debounce_seconds."""
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._next_fire is None:
+                        self._cond.wait()
+                        continue
+                    remaining = self._next_fire - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._running:
+                    return
+                self._next_fire = None
+                names, self._pending_names = self._pending_names, set()
+                full, self._full_reload_pending = self._full_reload_pending, False
+
+            try:
+                if full or self._file_commands is None:
+                    self.reload()
+                elif names:
+                    self._reload_files(names)
+            except Exception as e:
+                logger.error(f"[CommandWatcher] Reload failed: {e}")
 
     def _notify_result(self, result: ReloadResult) -> None:
         """Provide audio/visual feedback on reload result."""
@@ -208,7 +380,7 @@ class CommandWatcher:
             msg = f"Recargados {result.commands_loaded} comandos"
             if result.errors:
                 msg += f" ({len(result.errors)} errores)"
-            print(f"[CommandWatcher] {msg}")
+            logger.info(f"[CommandWatcher] {msg}")
 
             if self._sounds and self._sound_on_success:
                 try:
@@ -223,7 +395,7 @@ class CommandWatcher:
                     pass
         else:
             msg = f"Error recargando: {result.errors[0] if result.errors else 'unknown'}"
-            print(f"[CommandWatcher] {msg}")
+            logger.error(f"[CommandWatcher] {msg}")
 
             if self._sounds and self._sound_on_error:
                 try:
@@ -5,15 +5,25 @@ Busca archivos *.json en config/commands/ y los convierte en objetos Command
 que se registran en el CommandRegistry junto con los comandos built-in.
 """
 
-import glob
 import json
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Callable
 
 from core.commands import Command
 from core.state import State
 from core.action_executor import ActionExecutor
 
+logger = logging.getLogger("voiceflow.custom")
+
+# orjson (opcional) parsea bastante más rápido; sus errores heredan de
+# json.JSONDecodeError, así que el manejo de errores no cambia
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class CustomCommandLoader:
     """
@@ -84,41 +94,84 @@ class CustomCommandLoader:
             - errors: List of error messages (file or command level)
             - files_processed: List of file paths that were processed
         """
-        self._loaded_commands = []
-        errors: list[str] = []
-        files_processed: list[str] = []
+        by_file, errors, files_processed = self.load_all_by_file()
+        self._loaded_commands = [cmd for cmds in by_file.values() for cmd in cmds]
+        return self._loaded_commands, errors, files_processed
 
-        if not os.path.exists(self.commands_dir):
-            errors.append(f"Carpeta no encontrada: {self.commands_dir}")
-            return [], errors, []
+    def load_all_by_file(self) -> tuple[dict[str, list], list[str], list[str]]:
+        """
+        Como load_all_validated, pero con los comandos agrupados por archivo.
 
-        json_files = glob.glob(os.path.join(self.commands_dir, "*.json"))
+        Returns:
+            Tuple of (commands_by_file, errors, files_processed)
+            - commands_by_file: ruta -> Commands (solo archivos sin error)
+        """
+        # Una sola lectura del directorio; is_file() usa el tipo que ya
+        # devuelve readdir, sin un stat por archivo
+        try:
+            with os.scandir(self.commands_dir) as entries:
+                json_files = [
+                    entry.path for entry in entries
+                    if entry.name.endswith(".json")
+                    # Ignorar archivos que empiezan con _ (y ocultos, como glob)
+                    and not entry.name.startswith(("_", "."))
+                    and entry.is_file()
+                ]
+        except FileNotFoundError:
+            return {}, [f"Carpeta no encontrada: {self.commands_dir}"], []
 
-        # Ignorar archivos que empiezan con _
-        json_files = [f for f in json_files if not os.path.basename(f).startswith("_")]
+        by_file, errors = self.load_files(json_files)
+        return by_file, errors, json_files
 
-        for filepath in json_files:
-            files_processed.append(filepath)
-            try:
-                commands = self._load_file(filepath)
-                self._loaded_commands.extend(commands)
-            except json.JSONDecodeError as e:
-                error_msg = f"{os.path.basename(filepath)}: JSON inválido - {e}"
-                errors.append(error_msg)
-                print(f"[Custom] {error_msg}")
-            except Exception as e:
-                error_msg = f"{os.path.basename(filepath)}: {e}"
+    def load_files(self, filepaths: list[str]) -> tuple[dict[str, list], list[str]]:
+        """
+        Carga y valida solo los archivos indicados (recarga incremental).
+
+        Con varios archivos se leen en paralelo: la espera de disco (o de
+        una carpeta en red) se solapa; el resultado mantiene el orden.
+
+        Returns:
+            Tuple of (commands_by_file, errors). Los archivos con error no
+            aparecen en commands_by_file.
+        """
+        if len(filepaths) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(filepaths))) as pool:
+                results = list(pool.map(self._load_file_safe, filepaths))
+        else:
+            results = [self._load_file_safe(filepath) for filepath in filepaths]
+
+        by_file: dict[str, list] = {}
+        errors: list[str] = []
+        for filepath, (commands, error_msg) in zip(filepaths, results):
+            if error_msg is None:
+                by_file[filepath] = commands
+            else:
                 errors.append(error_msg)
-                print(f"[Custom] Error cargando {filepath}: {e}")
 
-        return self._loaded_commands, errors, files_processed
+        return by_file, errors
+
+    def _load_file_safe(self, filepath: str) -> tuple[list, Optional[str]]:
+        """_load_file sin excepciones: (commands, None) o ([], mensaje de error)."""
+        try:
+            return self._load_file(filepath), None
+        except json.JSONDecodeError as e:
+            error_msg = f"{os.path.basename(filepath)}: JSON inválido - {e}"
+            logger.error(f"[Custom] {error_msg}")
+            return [], error_msg
+        except Exception as e:
+            logger.error(f"[Custom] Error cargando {filepath}: {e}")
+            return [], f"{os.path.basename(filepath)}: {e}"
 
     def _load_file(self, filepath: str) -> list:
         """Carga un archivo JSON y retorna lista de Commands."""
         filename = os.path.basename(filepath)
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if orjson is not None:
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
 
         commands = []
         cmd_defs = data.get("commands", [])
@@ -137,21 +190,21 @@ class CustomCommandLoader:
             state_names = cmd_def.get("states", ["idle"])
             allowed_states = self._parse_states(state_names)
 
-            # Crear la acción (closure con las acciones del comando)
-            actions = cmd_def["actions"]
+            # Crear la acción (closure con el pipeline ya preparado)
             cmd_name = cmd_def["name"]
+            pipeline = self.executor.compile_pipeline(cmd_def["actions"], cmd_name)
 
-            def make_action(acts, name, executor):
+            def make_action(run_pipeline, name, executor):
                 """Factory para evitar problema de closure en loops."""
                 def action_fn():
                     try:
-                        success = executor.execute_pipeline(acts, name)
+                        success = run_pipeline()
                         if not success and executor.overlay:
                             executor.overlay.show_text("Error ejecutando comando", is_command=False)
                         return success
                     except Exception as e:
                         error_msg = str(e)
-                        print(f"[Custom] Error en '{name}': {error_msg}")
+                        logger.error(f"[Custom] Error en '{name}': {error_msg}")
                         if executor.overlay:
                             # Mostrar error en overlay
                             executor.overlay.show_text(error_msg, is_command=False)
@@ -160,14 +213,14 @@ class CustomCommandLoader:
 
             cmd = Command(
                 keywords=all_keywords,
-                action=make_action(actions, cmd_name, self.executor),
+                action=make_action(pipeline, cmd_name, self.executor),
                 allowed_states=allowed_states,
                 sound=cmd_def.get("sound")
             )
             commands.append(cmd)
 
         if commands:
-            print(f"[Custom] Cargados {len(commands)} comandos de {filename}")
+            logger.info(f"[Custom] Cargados {len(commands)} comandos de {filename}")
 
         return commands
 
@@ -177,19 +230,19 @@ class CustomCommandLoader:
 
         for field in required:
             if field not in cmd_def:
-                print(f"[Custom] Error en {filepath}: falta campo '{field}'")
+                logger.error(f"[Custom] Error en {filepath}: falta campo '{field}'")
                 return False
 
         if not isinstance(cmd_def["keywords"], list):
-            print(f"[Custom] Error en {filepath}: 'keywords' debe ser una lista")
+            logger.error(f"[Custom] Error en {filepath}: 'keywords' debe ser una lista")
             return False
 
         if len(cmd_def["keywords"]) == 0:
-            print(f"[Custom] Error en {filepath}: 'keywords' no puede estar vacío")
+            logger.error(f"[Custom] Error en {filepath}: 'keywords' no puede estar vacío")
             return False
 
         if not isinstance(cmd_def["actions"], list):
-            print(f"[Custom] Error en {filepath}: 'actions' debe ser una lista")
+            logger.error(f"[Custom] Error en {filepath}: 'actions' debe ser una lista")
             return False
 
         return True
@@ -202,7 +255,7 @@ class CustomCommandLoader:
             if name_lower in self.STATE_MAP:
                 states.append(self.STATE_MAP[name_lower])
             else:
-                print(f"[Custom] Estado desconocido: {name}, usando IDLE")
+                logger.warning(f"[Custom] Estado desconocido: {name}, usando IDLE")
                 states.append(State.IDLE)
 
         return states if states else [State.IDLE]
@@ -59,14 +59,15 @@ class VoiceEngine:
         self.recognizer = KaldiRecognizer(self.model, 16000)
         self.on_result = on_result
         self.on_mic_level = on_mic_level
-        self._queue = queue.Queue()
+        # SimpleQueue: sin maxsize ni task_done, put/get más baratos (callback de audio)
+        self._queue = queue.SimpleQueue()
         self._running = False
         self._gain = gain
         self._mic_threshold = mic_threshold
         self._blocksize = blocksize
+        # Buffer float32 reutilizado por el callback (ganancia y nivel)
+        self._scratch = np.empty(blocksize, dtype=np.float32)
 
-        # Lock para swap atómico del recognizer
-        self._recognizer_lock = threading.Lock()
         self._upgrade_thread = None
         self._current_model_name = model_name
 
@@ -98,12 +99,12 @@ class VoiceEngine:
             large_model = Model(model_path)
             large_recognizer = KaldiRecognizer(large_model, 16000)
 
-            # Swap atómico
-            with self._recognizer_lock:
-                old_model = self.model
-                self.model = large_model
-                self.recognizer = large_recognizer
-                self._current_model_name = model_name
+            # Swap: el recognizer nuevo ya está completo; asignar el atributo
+            # es atómico y el loop de audio lo toma en el siguiente bloque
+            old_model = self.model
+            self.model = large_model
+            self.recognizer = large_recognizer
+            self._current_model_name = model_name
 
             elapsed = time.time() - start_time
             print(f"[Vosk] Upgrade a '{model_name}' completado ({elapsed:.1f}s)")
@@ -118,22 +119,29 @@ class VoiceEngine:
         if status:
             print(f"Audio status: {status}")
 
-        # Convertir a numpy para procesar
-        audio_data = np.frombuffer(indata, dtype=np.int16).copy()
+        # Vista int16 del buffer de PortAudio (sin copia)
+        audio_data = np.frombuffer(indata, dtype=np.int16)
+        if len(audio_data) > len(self._scratch):
+            self._scratch = np.empty(len(audio_data), dtype=np.float32)
+        scratch = self._scratch[:len(audio_data)]
 
         # Aplicar ganancia si > 1.0
         if self._gain > 1.0:
-            # Amplificar y clipear para evitar overflow
-            amplified = audio_data.astype(np.float32) * self._gain
-            amplified = np.clip(amplified, -32768, 32767)
-            audio_data = amplified.astype(np.int16)
-
-        # Enviar audio amplificado a Vosk
-        self._queue.put(bytes(audio_data))
+            # Amplificar y clipear en el buffer reutilizado
+            np.multiply(audio_data, self._gain, out=scratch)
+            np.clip(scratch, -32768, 32767, out=scratch)
+            # Enviar audio amplificado a Vosk
+            self._queue.put(scratch.astype(np.int16).tobytes())
+        else:
+            # Sin ganancia: una sola copia, directa del buffer de PortAudio
+            self._queue.put(bytes(indata))
+            if self.on_mic_level:
+                np.copyto(scratch, audio_data)
 
         # Calcular nivel de audio para feedback visual
         if self.on_mic_level:
-            rms = np.sqrt(np.mean(audio_data.astype(np.float32) ** 2))
+            # Suma de cuadrados con un solo producto escalar sobre el scratch
+            rms = np.sqrt(np.dot(scratch, scratch) / len(scratch)) if len(scratch) else 0.0
             # Normalizar a 0-1 usando umbral configurable
             level = min(1.0, rms / self._mic_threshold)
             self.on_mic_level(level)
@@ -149,13 +157,14 @@ class VoiceEngine:
         ):
             while self._running:
                 data = self._queue.get()
-                # Usar lock para acceso seguro al recognizer durante swap
-                with self._recognizer_lock:
-                    if self.recognizer.AcceptWaveform(data):
-                        result = json.loads(self.recognizer.Result())
-                        text = result.get("text", "").strip()
-                        if text:
-                            self.on_result(text)
+                # Una lectura por bloque: si hay swap a mitad, este bloque
+                # termina con el recognizer anterior (sin lock en el loop)
+                recognizer = self.recognizer
+                if recognizer.AcceptWaveform(data):
+                    result = json.loads(recognizer.Result())
+                    text = result.get("text", "").strip()
+                    if text:
+                        self.on_result(text)
 
     def stop(self):
         self._running = False
@@ -4,27 +4,72 @@ EventServer - Servidor HTTP para recibir eventos de Claude Code.
 Ejecuta FastAPI en un thread separado para no bloquear PyQt6.
 """
 
+import asyncio
+import heapq
+import inspect
+import itertools
+import secrets
 import threading
-import uuid
 import time
 import json
 import os
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Callable, Optional, Dict, Any, List
 
 try:
-    from fastapi import FastAPI, HTTPException, Request, Header, Depends
+    from fastapi import FastAPI, HTTPException, Request, Header, Depends, Response
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.middleware.gzip import GZipMiddleware
+    from fastapi.routing import APIRoute
     from pydantic import BaseModel, Field
     import uvicorn
     FASTAPI_AVAILABLE = True
 except ImportError:
     FASTAPI_AVAILABLE = False
 
+# orjson (opcional) codifica bastante más rápido que json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("voiceflow.events")
+# Cada petición se registra en DEBUG (por defecto no se escribe nada en el
+# camino caliente); VOICEFLOW_EVENTSERVER_DEBUG=1 lo activa
+if os.environ.get("VOICEFLOW_EVENTSERVER_DEBUG") == "1":
+    logger.setLevel(logging.DEBUG)
+
 # Logger para Tailscale
 _tailscale_logger = logging.getLogger("voiceflow.tailscale")
 
+# correlation_id por defecto: solo tiene que ser único en este proceso, así
+# que basta un contador con un prefijo aleatorio por arranque (sin uuid4)
+_id_nonce = secrets.token_hex(4)
+_id_counter = itertools.count(1)
+
+
+def _new_correlation_id() -> str:
+    """Genera un correlation_id único para esta ejecución del servidor."""
+    return f"{_id_nonce}-{next(_id_counter):x}"
+
+
+def _json_bytes(content: Any) -> bytes:
+    """
+    Serializa a JSON con el mismo formato compacto que JSONResponse.
+
+    Usa orjson si está instalado; si no puede con algún valor (ej. enteros
+    de más de 64 bits) se usa json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            pass
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
 # ========== RATE LIMITING ==========
 
@@ -66,6 +111,34 @@ class RateLimiter:
         return max(0, self.max_requests - len(valid))
 
 
+# ========== RUTAS ==========
+
+if FASTAPI_AVAILABLE:
+    class ORJSONBodyRoute(APIRoute):
+        """
+        APIRoute que decodifica el body JSON con orjson.
+
+        Deja el resultado en la caché de Request.json(), que es lo que usa
+        FastAPI para validar el body. Si orjson no puede con el body (JSON
+        inválido, NaN...) no se toca nada y FastAPI lo trata como siempre.
+        """
+
+        def get_route_handler(self) -> Callable:
+            handler = super().get_route_handler()
+
+            async def orjson_handler(request: Request) -> Response:
+                if request.headers.get("content-type", "").startswith("application/json"):
+                    body = await request.body()
+                    if body:
+                        try:
+                            request._json = orjson.loads(body)
+                        except orjson.JSONDecodeError:
+                            pass
+                return await handler(request)
+
+            return orjson_handler
+
+
 # ========== MODELOS ==========
 
 if FASTAPI_AVAILABLE:
@@ -78,7 +151,7 @@ if FASTAPI_AVAILABLE:
 
     class NotificationRequest(BaseModel):
         """Request para crear una notificación."""
-        correlation_id: Optional[str] = Field(default_factory=lambda: str(uuid.uuid4()))
+        correlation_id: Optional[str] = Field(default_factory=_new_correlation_id)
         title: str
         body: str = ""
         type: str = "confirmation"
@@ -101,13 +174,6 @@ if FASTAPI_AVAILABLE:
         command: str  # Texto del comando (ej: "enter", "aceptar", "dictado")
         source: str = "iphone"
 
-    class StatusResponse(BaseModel):
-        """Response del estado del servidor."""
-        status: str = "running"
-        notifications_count: int = 0
-        pending_count: int = 0
-        uptime_seconds: float = 0
-
     class HealthResponse(BaseModel):
         """Response del health check."""
         status: str = "healthy"
@@ -180,7 +246,9 @@ class EventServer:
         on_dismiss: Optional[Callable[[str], None]] = None,
         tailscale_config: Optional[dict] = None,
         execute_action: Optional[Callable[[dict], bool]] = None,
-        on_command: Optional[Callable[[str], dict]] = None
+        on_command: Optional[Callable[[str], dict]] = None,
+        callback_workers: int = 1,
+        max_notifications: int = 500
     ):
         if not FASTAPI_AVAILABLE:
             raise ImportError("FastAPI no instalado. Ejecuta: pip install fastapi uvicorn")
@@ -192,9 +260,37 @@ class EventServer:
         self.on_dismiss = on_dismiss
         self.execute_action = execute_action  # Para ejecutar hotkeys directamente
         self.on_command = on_command  # Para ejecutar comandos de voz via HTTP
+        # Los callbacks (panel PyQt6, hotkeys, comandos) pueden bloquear: se
+        # ejecutan en este pool para no parar el event loop de uvicorn. Con
+        # un solo worker siguen ejecutándose de uno en uno y en orden de
+        # llegada (NotificationManager no tiene locks y las hotkeys no deben
+        # solaparse); más workers solo con callbacks thread-safe.
+        self._executor = ThreadPoolExecutor(
+            max_workers=callback_workers,
+            thread_name_prefix="evtsrv-cb"
+        )
 
         self._start_time = time.time()
+        # Copy-on-write: altas y bajas publican un dict nuevo, así quien lo
+        # recorre (listado, última pendiente) ve una instantánea estable
+        # aunque update_notification_status llegue desde otro thread
         self._notifications: Dict[str, dict] = {}
+        self._notifications_lock = threading.Lock()  # Solo escrituras
+        # Caché de /api/notifications: (versión, JSON). Cada cambio en las
+        # notificaciones incrementa la versión y la caché deja de valer.
+        self._notifications_version = 0
+        self._list_cache: Optional[tuple] = None
+        # JSON de cada notificación: cid -> (notificación, estado, bytes).
+        # Solo se recodifican las nuevas o las que cambiaron de estado.
+        self._entry_cache: Dict[str, tuple] = {}
+        # Notificaciones por estado, al día con cada alta/baja/cambio de
+        # estado: el contador de pendientes no recorre todas las notificaciones
+        self._status_counts: Counter = Counter()
+        # Caducidad: heap de (expira_en, correlation_id). Las notificaciones
+        # pendientes pasan a "expired" al vencer su timeout_seconds; como
+        # mucho se guardan max_notifications (se descartan las más antiguas)
+        self._expiry_heap: List[tuple] = []
+        self._max_notifications = max_notifications
         self._thread: Optional[threading.Thread] = None
         self._running = False
 
@@ -344,6 +440,9 @@ class EventServer:
             description="Servidor para notificaciones de Claude Code",
             version="1.0.0"
         )
+        if orjson is not None:
+            # Bodies de /api/notification, /api/intent... decodificados con orjson
+            app.router.route_class = ORJSONBodyRoute
 
         # CORS - restringir a localhost y redes Tailscale (100.x.x.x)
         app.add_middleware(
@@ -360,6 +459,10 @@ class EventServer:
             allow_headers=["Authorization", "Content-Type"],
         )
 
+        # Comprimir respuestas grandes (el listado de notificaciones crece
+        # con cada una); las pequeñas (/api/status, /ping) salen tal cual
+        app.add_middleware(GZipMiddleware, minimum_size=1024)
+
         # Crear dependencia de autenticación
         verify_auth = self._create_auth_dependency()
 
@@ -378,11 +481,9 @@ class EventServer:
         @app.get("/health/deep", response_model=DeepHealthResponse)
         async def deep_health_check(request: Request, _: bool = Depends(verify_auth)):
             """Health check detallado con estado de componentes (requiere auth)."""
+            self._expire_notifications()
             # Contar notificaciones pendientes
-            pending_count = sum(
-                1 for n in self._notifications.values()
-                if n.get("status") == "pending"
-            )
+            pending_count = self._status_counts["pending"]
 
             # Obtener uso de memoria
             memory_mb = 0.0
@@ -456,15 +557,20 @@ class EventServer:
 
         # ========== ENDPOINTS EXISTENTES ==========
 
-        @app.get("/api/status", response_model=StatusResponse)
-        async def get_status():
+        # Los GET de respuesta fija (/api/status, /api/notifications y /)
+        # son rutas Starlette simples (ver el final de _create_app): sin
+        # resolución de dependencias ni validación del response_model
+        async def get_status(request: Request):
             """Estado del servidor."""
-            pending = sum(1 for n in self._notifications.values() if n.get("status") == "pending")
-            return StatusResponse(
-                status="running",
-                notifications_count=len(self._notifications),
-                pending_count=pending,
-                uptime_seconds=time.time() - self._start_time
+            self._expire_notifications()
+            return Response(
+                content=_json_bytes({
+                    "status": "running",
+                    "notifications_count": len(self._notifications),
+                    "pending_count": self._status_counts["pending"],
+                    "uptime_seconds": time.time() - self._start_time
+                }),
+                media_type="application/json"
             )
 
         @app.post("/api/notification")
@@ -473,16 +579,17 @@ class EventServer:
             data = notification.model_dump()
             data["timestamp"] = time.time()
             data["status"] = "pending"
+            self._expire_notifications()
 
             # Callback primero (puede rechazar duplicados)
             accepted = True
             if self.on_notification:
                 try:
-                    result = self.on_notification(data)
+                    result = await self._run_callback(self.on_notification, data)
                     # Si retorna False explícitamente, es duplicada
                     if result is False:
                         accepted = False
-                        print(f"[EventServer] Notificación duplicada rechazada: {data['title']}")
+                        logger.debug(f"[EventServer] Notificación duplicada rechazada: {data['title']}")
                         return {
                             "success": True,
                             "correlation_id": data["correlation_id"],
@@ -490,12 +597,12 @@ class EventServer:
                             "duplicate": True
                         }
                 except Exception as e:
-                    print(f"[EventServer] Error en callback de notificación: {e}")
+                    logger.error(f"[EventServer] Error en callback de notificación: {e}")
 
             # Guardar solo si fue aceptada
             if accepted:
-                self._notifications[data["correlation_id"]] = data
-                print(f"[EventServer] Nueva notificación: {data['title']}")
+                self._store_notification(data)
+                logger.debug(f"[EventServer] Nueva notificación: {data['title']}")
 
             return {
                 "success": True,
@@ -512,14 +619,14 @@ class EventServer:
             """Ejecuta un intent (respuesta a notificación). Requiere auth si Tailscale está habilitado."""
             start_time = time.time()
             cid = intent.correlation_id
+            self._expire_notifications()
 
             # Verificar que existe la notificación
-            if cid not in self._notifications:
+            notification = self._notifications.get(cid)
+            if notification is None:
                 self._log_metric(request, 404, (time.time() - start_time) * 1000)
                 raise HTTPException(status_code=404, detail="Notificación no encontrada")
 
-            notification = self._notifications[cid]
-
             # Verificar estado
             if notification.get("status") != "pending":
                 self._log_metric(request, 400, (time.time() - start_time) * 1000)
@@ -529,7 +636,7 @@ class EventServer:
                 )
 
             # Actualizar estado
-            notification["status"] = "executing"
+            self._set_status(notification, "executing")
 
             # Preparar intent data
             intent_data = intent.model_dump()
@@ -539,17 +646,17 @@ class EventServer:
             # Callback
             if self.on_intent:
                 try:
-                    self.on_intent(intent_data)
-                    notification["status"] = "completed"
+                    await self._run_callback(self.on_intent, intent_data)
+                    self._set_status(notification, "completed")
                 except Exception as e:
-                    notification["status"] = "failed"
+                    self._set_status(notification, "failed")
                     self._log_metric(request, 500, (time.time() - start_time) * 1000)
-                    print(f"[EventServer] Error ejecutando intent: {e}")
+                    logger.error(f"[EventServer] Error ejecutando intent: {e}")
                     raise HTTPException(status_code=500, detail=str(e))
 
             latency = (time.time() - start_time) * 1000
             self._log_metric(request, 200, latency)
-            print(f"[EventServer] Intent ejecutado: {intent.intent} en {cid[:12]}... ({latency:.1f}ms)")
+            logger.debug(f"[EventServer] Intent ejecutado: {intent.intent} en {cid[:12]}... ({latency:.1f}ms)")
 
             return {
                 "success": True,
@@ -589,11 +696,12 @@ class EventServer:
             start_time = time.time()
             client_ip = request.client.host if request.client else "unknown"
 
+            self._expire_notifications()
             cid, notification = _get_latest_pending(self)
 
             if cid and notification:
                 # Hay notificación pendiente -> procesar normalmente
-                notification["status"] = "executing"
+                self._set_status(notification, "executing")
                 intent_data = {
                     "correlation_id": cid,
                     "intent": "accept",
@@ -605,16 +713,16 @@ class EventServer:
 
                 if self.on_intent:
                     try:
-                        self.on_intent(intent_data)
-                        notification["status"] = "completed"
+                        await self._run_callback(self.on_intent, intent_data)
+                        self._set_status(notification, "completed")
                     except Exception as e:
-                        notification["status"] = "failed"
+                        self._set_status(notification, "failed")
                         self._log_metric(request, 500, (time.time() - start_time) * 1000)
                         raise HTTPException(status_code=500, detail=str(e))
 
                 latency = (time.time() - start_time) * 1000
                 self._log_metric(request, 200, latency)
-                print(f"[EventServer] Accept via shortcut: {cid[:12]}... ({latency:.1f}ms)")
+                logger.debug(f"[EventServer] Accept via shortcut: {cid[:12]}... ({latency:.1f}ms)")
 
                 return {
                     "success": True,
@@ -629,11 +737,11 @@ class EventServer:
                 if self.execute_action:
                     try:
                         action = {"id": "accept", "hotkey": "enter", "label": "Accept (global)"}
-                        self.execute_action(action)
+                        await self._run_callback(self.execute_action, action)
 
                         latency = (time.time() - start_time) * 1000
                         self._log_metric(request, 200, latency)
-                        print(f"[EventServer] Accept global (sin notificación) desde {client_ip} ({latency:.1f}ms)")
+                        logger.debug(f"[EventServer] Accept global (sin notificación) desde {client_ip} ({latency:.1f}ms)")
 
                         return {
                             "success": True,
@@ -666,11 +774,12 @@ class EventServer:
             start_time = time.time()
             client_ip = request.client.host if request.client else "unknown"
 
+            self._expire_notifications()
             cid, notification = _get_latest_pending(self)
 
             if cid and notification:
                 # Hay notificación pendiente -> procesar normalmente
-                notification["status"] = "executing"
+                self._set_status(notification, "executing")
                 intent_data = {
                     "correlation_id": cid,
                     "intent": "reject",
@@ -682,16 +791,16 @@ class EventServer:
 
                 if self.on_intent:
                     try:
-                        self.on_intent(intent_data)
-                        notification["status"] = "completed"
+                        await self._run_callback(self.on_intent, intent_data)
+                        self._set_status(notification, "completed")
                     except Exception as e:
-                        notification["status"] = "failed"
+                        self._set_status(notification, "failed")
                         self._log_metric(request, 500, (time.time() - start_time) * 1000)
                         raise HTTPException(status_code=500, detail=str(e))
 
                 latency = (time.time() - start_time) * 1000
                 self._log_metric(request, 200, latency)
-                print(f"[EventServer] Reject via shortcut: {cid[:12]}... ({latency:.1f}ms)")
+                logger.debug(f"[EventServer] Reject via shortcut: {cid[:12]}... ({latency:.1f}ms)")
 
                 return {
                     "success": True,
@@ -706,11 +815,11 @@ class EventServer:
                 if self.execute_action:
                     try:
                         action = {"id": "reject", "hotkey": "escape", "label": "Reject (global)"}
-                        self.execute_action(action)
+                        await self._run_callback(self.execute_action, action)
 
                         latency = (time.time() - start_time) * 1000
                         self._log_metric(request, 200, latency)
-                        print(f"[EventServer] Reject global (sin notificación) desde {client_ip} ({latency:.1f}ms)")
+                        logger.debug(f"[EventServer] Reject global (sin notificación) desde {client_ip} ({latency:.1f}ms)")
 
                         return {
                             "success": True,
@@ -754,12 +863,12 @@ class EventServer:
                 raise HTTPException(status_code=501, detail="Comandos no configurados")
 
             try:
-                result = self.on_command(command_text)
+                result = await self._run_callback(self.on_command, command_text)
 
                 latency = (time.time() - start_time) * 1000
                 self._log_metric(request, 200, latency)
 
-                print(f"[EventServer] Comando '{command_text}' desde {client_ip} ({latency:.1f}ms)")
+                logger.debug(f"[EventServer] Comando '{command_text}' desde {client_ip} ({latency:.1f}ms)")
 
                 return {
                     "success": result.get("success", False),
@@ -771,32 +880,36 @@ class EventServer:
 
             except Exception as e:
                 self._log_metric(request, 500, (time.time() - start_time) * 1000)
-                print(f"[EventServer] Error comando '{command_text}': {e}")
+                logger.error(f"[EventServer] Error comando '{command_text}': {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
-        @app.get("/api/notifications")
-        async def list_notifications():
+        async def list_notifications(request: Request):
             """Lista todas las notificaciones."""
-            return {
-                "notifications": list(self._notifications.values()),
-                "count": len(self._notifications)
-            }
+            self._expire_notifications()
+            # Sin jsonable_encoder y codificado con orjson. Sin cambios desde
+            # la última vez se reutiliza el JSON ya codificado (la versión se
+            # lee antes de codificar: un cambio a mitad invalida la caché).
+            version = self._notifications_version
+            cached = self._list_cache
+            if cached is None or cached[0] != version:
+                content = self._encode_notifications(self._notifications)
+                self._list_cache = cached = (version, content)
+            return Response(content=cached[1], media_type="application/json")
 
         @app.delete("/api/notification/{correlation_id}")
         async def delete_notification(correlation_id: str):
             """Elimina una notificación (dismiss)."""
             # Eliminar de nuestra lista interna si existe
-            if correlation_id in self._notifications:
-                del self._notifications[correlation_id]
+            self._remove_notification(correlation_id)
 
             # Callback para notificar al panel
             if self.on_dismiss:
                 try:
-                    self.on_dismiss(correlation_id)
+                    await self._run_callback(self.on_dismiss, correlation_id)
                 except Exception as e:
-                    print(f"[EventServer] Error en callback de dismiss: {e}")
+                    logger.error(f"[EventServer] Error en callback de dismiss: {e}")
 
-            print(f"[EventServer] Dismiss: {correlation_id[:12]}...")
+            logger.debug(f"[EventServer] Dismiss: {correlation_id[:12]}...")
             return {"success": True, "message": "Notificación eliminada"}
 
         @app.post("/api/commands/reload", response_model=CommandReloadResponse)
@@ -836,54 +949,67 @@ class EventServer:
                 )
             except Exception as e:
                 self._log_metric(request, 500, (time.time() - start_time) * 1000)
-                print(f"[EventServer] Error reloading commands: {e}")
+                logger.error(f"[EventServer] Error reloading commands: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
-        @app.get("/")
-        async def root():
+        # La respuesta de / no cambia mientras el servidor vive: se codifica
+        # una sola vez
+        endpoints = [
+            "GET  /health              - Health check (sin auth)",
+            "GET  /ping                - Medir latencia (requiere auth)",
+            "GET  /api/status          - Estado del servidor",
+            "GET  /api/metrics         - Métricas de latencia (requiere auth)",
+            "POST /api/notification    - Crear notificación",
+            "POST /api/intent          - Ejecutar intent (requiere auth)",
+            "POST /api/accept          - Aceptar/Enter global (Shortcut)",
+            "POST /api/reject          - Rechazar/Escape global (Shortcut)",
+            "POST /api/command         - Ejecutar comando de voz (requiere auth)",
+            "POST /api/commands/reload - Recargar comandos custom (requiere auth)",
+            "GET  /api/notifications   - Listar notificaciones",
+            "DELETE /api/notification/{id} - Eliminar notificación"
+        ]
+        root_body = _json_bytes({
+            "service": "VoiceFlow Event Server",
+            "status": "running",
+            "tailscale_enabled": self._tailscale_enabled,
+            "endpoints": endpoints
+        })
+
+        async def root(request: Request):
             """Endpoint raíz para verificar que el servidor está activo."""
-            endpoints = [
-                "GET  /health              - Health check (sin auth)",
-                "GET  /ping                - Medir latencia (requiere auth)",
-                "GET  /api/status          - Estado del servidor",
-                "GET  /api/metrics         - Métricas de latencia (requiere auth)",
-                "POST /api/notification    - Crear notificación",
-                "POST /api/intent          - Ejecutar intent (requiere auth)",
-                "POST /api/accept          - Aceptar/Enter global (Shortcut)",
-                "POST /api/reject          - Rechazar/Escape global (Shortcut)",
-                "POST /api/command         - Ejecutar comando de voz (requiere auth)",
-                "POST /api/commands/reload - Recargar comandos custom (requiere auth)",
-                "GET  /api/notifications   - Listar notificaciones",
-                "DELETE /api/notification/{id} - Eliminar notificación"
-            ]
-            return {
-                "service": "VoiceFlow Event Server",
-                "status": "running",
-                "tailscale_enabled": self._tailscale_enabled,
-                "endpoints": endpoints
-            }
+            return Response(content=root_body, media_type="application/json")
+
+        app.add_route("/api/status", get_status, methods=["GET"])
+        app.add_route("/api/notifications", list_notifications, methods=["GET"])
+        app.add_route("/", root, methods=["GET"])
 
         return app
 
     def start(self):
         """Inicia el servidor en un thread separado."""
         if self._running:
-            print("[EventServer] Ya está corriendo")
+            logger.warning("[EventServer] Ya está corriendo")
             return
 
         self._running = True
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
-        print(f"[EventServer] Iniciado en http://{self.host}:{self.port}")
+        logger.info(f"[EventServer] Iniciado en http://{self.host}:{self.port}")
 
     def _run(self):
         """Ejecuta uvicorn (bloquea el thread)."""
+        # loop/http "auto" eligen uvloop y httptools si están instalados
+        # (requirements.txt); uvloop no existe en Windows y ahí queda asyncio.
+        # La app no tiene startup/shutdown, así que sin lifespan.
         config = uvicorn.Config(
             self._app,
             host=self.host,
             port=self.port,
             log_level="warning",
-            access_log=False
+            access_log=False,
+            loop="auto",
+            http="auto",
+            lifespan="off"
         )
         server = uvicorn.Server(config)
         server.run()
@@ -892,17 +1018,115 @@ class EventServer:
         """Detiene el servidor y guarda métricas pendientes."""
         self._flush_metrics()  # Guardar métricas pendientes
         self._running = False
+        self._executor.shutdown(wait=False)
         # uvicorn no tiene stop graceful fácil, el thread daemon morirá con el proceso
 
     @property
     def is_running(self) -> bool:
         return self._running
 
+    async def _run_callback(self, callback: Callable, *args):
+        """
+        Ejecuta un callback sin bloquear el event loop.
+
+        Las corrutinas se esperan directamente; las funciones normales van
+        al pool de callbacks. Devuelve el resultado del callback.
+        """
+        if inspect.iscoroutinefunction(callback):
+            return await callback(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, callback, *args)
+
+    def _encode_notifications(self, notifications: Dict[str, dict]) -> bytes:
+        """
+        JSON de /api/notifications reutilizando lo ya codificado.
+
+        Una notificación guardada solo cambia de estado (_set_status), así
+        que su JSON vale mientras sea el mismo objeto con el mismo estado.
+        """
+        old_cache = self._entry_cache
+        cache = {}
+        for cid, notification in notifications.items():
+            status = notification.get("status")
+            entry = old_cache.get(cid)
+            if entry is None or entry[0] is not notification or entry[1] != status:
+                entry = (notification, status, _json_bytes(notification))
+            cache[cid] = entry
+        # Las borradas desaparecen al reconstruir
+        self._entry_cache = cache
+        return b'{"notifications":[%s],"count":%d}' % (
+            b",".join(entry[2] for entry in cache.values()),
+            len(cache)
+        )
+
     def update_notification_status(self, correlation_id: str, status: str):
         """Actualiza el estado de una notificación."""
-        if correlation_id in self._notifications:
-            self._notifications[correlation_id]["status"] = status
-
+        notification = self._notifications.get(correlation_id)
+        if notification is not None:
+            self._set_status(notification, status)
+
+    def _store_notification(self, data: dict):
+        """Guarda (o reemplaza) una notificación."""
+        cid = data["correlation_id"]
+        with self._notifications_lock:
+            notifications = dict(self._notifications)
+            old = notifications.pop(cid, None)
+            if old is not None:
+                self._status_counts[old.get("status")] -= 1
+            notifications[cid] = data
+            self._status_counts[data.get("status")] += 1
+            # Límite de memoria: el dict conserva el orden de llegada
+            while len(notifications) > self._max_notifications:
+                oldest = notifications.pop(next(iter(notifications)))
+                self._status_counts[oldest.get("status")] -= 1
+            self._notifications = notifications
+            self._notifications_version += 1
+            heapq.heappush(self._expiry_heap, (data["timestamp"] + data["timeout_seconds"], cid))
+
+    def _expire_notifications(self):
+        """
+        Marca como "expired" las notificaciones pendientes ya vencidas.
+
+        Solo mira la cima del heap, así que sin vencimientos cuesta O(1).
+        Las entradas de notificaciones borradas o reemplazadas se descartan
+        al salir (se comprueba el vencimiento de la notificación guardada).
+        El heap solo se toca desde los endpoints (thread de uvicorn).
+        """
+        heap = self._expiry_heap
+        now = time.time()
+        while heap and heap[0][0] <= now:
+            _, cid = heapq.heappop(heap)
+            notification = self._notifications.get(cid)
+            if (notification is not None
+                    and notification.get("status") == "pending"
+                    and notification["timestamp"] + notification["timeout_seconds"] <= now):
+                self._set_status(notification, "expired")
+
+    def _remove_notification(self, correlation_id: str):
+        """Elimina una notificación si existe."""
+        with self._notifications_lock:
+            if correlation_id not in self._notifications:
+                return
+            notifications = dict(self._notifications)
+            notification = notifications.pop(correlation_id)
+            self._status_counts[notification.get("status")] -= 1
+            self._notifications = notifications
+            self._notifications_version += 1
+
+    def _set_status(self, notification: dict, status: str):
+        """
+        Cambia el estado de una notificación guardada.
+
+        Mantiene al día los contadores por estado e invalida la caché del
+        listado; todo cambio de estado debe pasar por aquí.
+        """
+        with self._notifications_lock:
+            # Una notificación ya borrada no cuenta en los contadores
+            if self._notifications.get(notification.get("correlation_id")) is notification:
+                self._status_counts[notification.get("status")] -= 1
+                self._status_counts[status] += 1
+            notification["status"] = status
+            self._notifications_version += 1
 
 # ========== FUNCIÓN DE PRUEBA ==========
 
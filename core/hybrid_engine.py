@@ -276,7 +276,7 @@ class HybridEngine:
         oww_frame_size = 1280  # 80ms a 16kHz
         audio_buffer = np.array([], dtype=np.int16)
         self._frame_count = 0  # Contador de frames procesados
-        self._last_status_time = time.time()  # Para log de status periódico
+        self._last_status_time = time.perf_counter()  # Para log de status periódico
 
         with sd.RawInputStream(
             samplerate=16000,
@@ -320,7 +320,7 @@ class HybridEngine:
                     self._frame_count += 1
 
                     prediction = self.model.predict(frame)
-                    current_time = time.time()
+                    current_time = time.perf_counter()
 
                     # Log de status cada 5 segundos
                     if current_time - self._last_status_time >= 5.0:
@@ -369,7 +369,7 @@ class HybridEngine:
 
                                 # Cooldown SIEMPRE después de captura (con o sin texto)
                                 # Esto evita falsos positivos por audio residual
-                                self._last_wake_time = time.time()
+                                self._last_wake_time = time.perf_counter()
                                 print(f"[Hybrid] Cooldown iniciado (próxima detección en {self._wake_cooldown}s)")
 
                                 # Volver a IDLE
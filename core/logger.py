@@ -10,8 +10,13 @@ El logger guarda automáticamente cada cierto intervalo para evitar
 pérdida de datos si la aplicación se cierra abruptamente.
 """
 
+import atexit
 import json
+import logging
+import logging.handlers
 import os
+import queue
+import sys
 import threading
 from datetime import datetime
 from typing import Optional
@@ -328,3 +333,35 @@ def get_logger() -> UsageLogger:
     if _logger is None:
         _logger = UsageLogger()
     return _logger
+
+
+# Listener de consola (uno por proceso)
+_console_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_console_logging(level: int = logging.INFO) -> None:
+    """
+    Envía los logs "voiceflow.*" a stdout desde un hilo aparte.
+
+    Los hilos que loguean (audio, watcher, navegador) solo encolan el
+    registro; el QueueListener es quien escribe y hace flush, así una
+    consola lenta no bloquea el reconocimiento. Llamadas repetidas no
+    hacen nada.
+    """
+    global _console_listener
+    if _console_listener is not None:
+        return
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger("voiceflow")
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    root.propagate = False
+
+    _console_listener = logging.handlers.QueueListener(log_queue, console)
+    _console_listener.start()
+    # Vacía lo pendiente al salir
+    atexit.register(_console_listener.stop)
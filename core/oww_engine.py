@@ -174,7 +174,7 @@ class OpenWakeWordEngine:
                     prediction = self.model.predict(frame)
 
                     # Revisar cada modelo
-                    current_time = time.time()
+                    current_time = time.perf_counter()
                     for model_name, score in prediction.items():
                         if score >= self._threshold:
                             # Verificar cooldown
@@ -327,7 +327,7 @@ class PicovoiceHybridEngine:
         """Inicia el loop de detección (bloqueante)."""
         self._running = True
         self._frame_count = 0
-        self._last_status_time = time.time()
+        self._last_status_time = time.perf_counter()
 
         # Crear recorder con el frame_length de Porcupine
         self._recorder = PvRecorder(
@@ -360,7 +360,7 @@ class PicovoiceHybridEngine:
                     continue
 
                 # Log de status periódico
-                current_time = time.time()
+                current_time = time.perf_counter()
                 if current_time - self._last_status_time >= STATUS_LOG_INTERVAL:
                     print(f"[Picovoice] Status: {self._frame_count} frames, sensibilidad={self._sensitivity}")
                     self._last_status_time = current_time
@@ -394,7 +394,7 @@ class PicovoiceHybridEngine:
                                 self.on_timeout()
 
                         # Cooldown después de captura
-                        self._last_wake_time = time.time()
+                        self._last_wake_time = time.perf_counter()
                         print(f"[Picovoice] Cooldown iniciado (próxima detección en {self._wake_cooldown}s)")
 
                         # Volver a IDLE
@@ -0,0 +1,375 @@
+"""
+Helpers Win32 via ctypes.
+
+Llamadas directas a user32 para operaciones que antes requerían lanzar
+PowerShell (enfocar ventanas) o varias llamadas a pyautogui (secuencias
+de teclado). En plataformas que no son Windows AVAILABLE es False y los
+helpers no deben usarse.
+"""
+
+import ctypes
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+AVAILABLE = sys.platform == 'win32'
+
+# Virtual-key codes usados por VoiceFlow
+VK_CONTROL = 0x11
+VK_DELETE = 0x2E
+VK_LWIN = 0x5B
+VK_A = 0x41
+VK_C = 0x43
+VK_V = 0x56
+
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+
+CF_UNICODETEXT = 13
+GMEM_MOVEABLE = 0x0002
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", ctypes.c_ushort),
+        ("wScan", ctypes.c_ushort),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", ctypes.c_long),
+        ("dy", ctypes.c_long),
+        ("mouseData", ctypes.c_ulong),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _INPUTUNION(ctypes.Union):
+    # MOUSEINPUT es el miembro más grande; define sizeof(INPUT)
+    _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+
+class INPUT(ctypes.Structure):
+    _anonymous_ = ("u",)
+    _fields_ = [("type", ctypes.c_ulong), ("u", _INPUTUNION)]
+
+
+if AVAILABLE:
+    from ctypes import wintypes
+
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+
+    _WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+    _EnumWindows = _user32.EnumWindows
+    _EnumWindows.argtypes = [_WNDENUMPROC, wintypes.LPARAM]
+    _EnumWindows.restype = wintypes.BOOL
+
+    _GetWindowTextLengthW = _user32.GetWindowTextLengthW
+    _GetWindowTextLengthW.argtypes = [wintypes.HWND]
+    _GetWindowTextLengthW.restype = ctypes.c_int
+
+    _GetWindowTextW = _user32.GetWindowTextW
+    _GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    _GetWindowTextW.restype = ctypes.c_int
+
+    _IsWindow = _user32.IsWindow
+    _IsWindow.argtypes = [wintypes.HWND]
+    _IsWindow.restype = wintypes.BOOL
+
+    _IsWindowVisible = _user32.IsWindowVisible
+    _IsWindowVisible.argtypes = [wintypes.HWND]
+    _IsWindowVisible.restype = wintypes.BOOL
+
+    _IsIconic = _user32.IsIconic
+    _IsIconic.argtypes = [wintypes.HWND]
+    _IsIconic.restype = wintypes.BOOL
+
+    _ShowWindow = _user32.ShowWindow
+    _ShowWindow.argtypes = [wintypes.HWND, ctypes.c_int]
+    _ShowWindow.restype = wintypes.BOOL
+
+    _SetForegroundWindow = _user32.SetForegroundWindow
+    _SetForegroundWindow.argtypes = [wintypes.HWND]
+    _SetForegroundWindow.restype = wintypes.BOOL
+
+    _GetForegroundWindow = _user32.GetForegroundWindow
+    _GetForegroundWindow.argtypes = []
+    _GetForegroundWindow.restype = wintypes.HWND
+
+    _SendInput = _user32.SendInput
+    _SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+    _SendInput.restype = wintypes.UINT
+
+    _GetClipboardSequenceNumber = _user32.GetClipboardSequenceNumber
+    _GetClipboardSequenceNumber.argtypes = []
+    _GetClipboardSequenceNumber.restype = wintypes.DWORD
+
+    _OpenClipboard = _user32.OpenClipboard
+    _OpenClipboard.argtypes = [wintypes.HWND]
+    _OpenClipboard.restype = wintypes.BOOL
+
+    _CloseClipboard = _user32.CloseClipboard
+    _CloseClipboard.argtypes = []
+    _CloseClipboard.restype = wintypes.BOOL
+
+    _EmptyClipboard = _user32.EmptyClipboard
+    _EmptyClipboard.argtypes = []
+    _EmptyClipboard.restype = wintypes.BOOL
+
+    _GetClipboardData = _user32.GetClipboardData
+    _GetClipboardData.argtypes = [wintypes.UINT]
+    _GetClipboardData.restype = wintypes.HANDLE
+
+    _SetClipboardData = _user32.SetClipboardData
+    _SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    _SetClipboardData.restype = wintypes.HANDLE
+
+    _CreateWindowExW = _user32.CreateWindowExW
+    _CreateWindowExW.argtypes = [
+        wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID,
+    ]
+    _CreateWindowExW.restype = wintypes.HWND
+
+    _DestroyWindow = _user32.DestroyWindow
+    _DestroyWindow.argtypes = [wintypes.HWND]
+    _DestroyWindow.restype = wintypes.BOOL
+
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+
+    _GlobalAlloc = _kernel32.GlobalAlloc
+    _GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    _GlobalAlloc.restype = wintypes.HGLOBAL
+
+    _GlobalFree = _kernel32.GlobalFree
+    _GlobalFree.argtypes = [wintypes.HGLOBAL]
+    _GlobalFree.restype = wintypes.HGLOBAL
+
+    _GlobalLock = _kernel32.GlobalLock
+    _GlobalLock.argtypes = [wintypes.HGLOBAL]
+    _GlobalLock.restype = wintypes.LPVOID
+
+    _GlobalUnlock = _kernel32.GlobalUnlock
+    _GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    _GlobalUnlock.restype = wintypes.BOOL
+
+SW_RESTORE = 9
+HWND_MESSAGE = -3  # Padre de las ventanas message-only
+
+
+def _window_title(hwnd) -> str:
+    """Devuelve el título de una ventana (vacío si no tiene)."""
+    length = _GetWindowTextLengthW(hwnd)
+    if not length:
+        return ""
+    buf = ctypes.create_unicode_buffer(length + 1)
+    _GetWindowTextW(hwnd, buf, length + 1)
+    return buf.value
+
+
+def find_window(title_contains: str) -> Optional[int]:
+    """
+    Busca la primera ventana visible cuyo título contenga el texto dado.
+
+    Returns:
+        HWND de la ventana o None si no hay ninguna
+    """
+    found = []
+
+    def _callback(hwnd, _lparam):
+        if _IsWindowVisible(hwnd) and title_contains in _window_title(hwnd):
+            found.append(hwnd)
+            return False  # Detener enumeración
+        return True
+
+    _EnumWindows(_WNDENUMPROC(_callback), 0)
+    return found[0] if found else None
+
+
+def is_window(hwnd) -> bool:
+    """True si el HWND sigue siendo una ventana válida."""
+    return bool(hwnd) and bool(_IsWindow(hwnd))
+
+
+def set_foreground(hwnd) -> bool:
+    """Trae la ventana al frente (restaurándola si está minimizada)."""
+    if _IsIconic(hwnd):
+        _ShowWindow(hwnd, SW_RESTORE)
+    return bool(_SetForegroundWindow(hwnd))
+
+
+def activate_by_title_contains(title_contains: str) -> Optional[str]:
+    """
+    Trae al frente la primera ventana visible cuyo título contenga el texto.
+
+    Returns:
+        Título de la ventana activada o None si no hay ninguna
+    """
+    hwnd = find_window(title_contains)
+    if hwnd is None:
+        return None
+    set_foreground(hwnd)
+    return _window_title(hwnd)
+
+
+def wait_foreground(hwnd, timeout: float) -> bool:
+    """
+    Espera (sondeando cada 5 ms) a que `hwnd` sea la ventana activa.
+
+    Returns:
+        True si pasó a primer plano antes del timeout
+    """
+    deadline = time.perf_counter() + timeout
+    while _GetForegroundWindow() != hwnd:
+        if time.perf_counter() >= deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def combo(*vks: int) -> list:
+    """
+    Eventos de una combinación de teclas: pulsa en orden y suelta al revés.
+
+    Ej: combo(VK_CONTROL, VK_A) -> Ctrl↓ A↓ A↑ Ctrl↑
+    """
+    return [(vk, True) for vk in vks] + [(vk, False) for vk in reversed(vks)]
+
+
+def build_inputs(events: list):
+    """
+    Construye el array INPUT[] para SendInput a partir de (vk, pulsada).
+
+    Pensado para precalcularse una vez y reutilizarse con send_inputs().
+    """
+    arr = (INPUT * len(events))()
+    for inp, (vk, down) in zip(arr, events):
+        inp.type = INPUT_KEYBOARD
+        inp.ki.wVk = vk
+        inp.ki.dwFlags = 0 if down else KEYEVENTF_KEYUP
+    return arr
+
+
+def send_inputs(inputs) -> int:
+    """Envía un array INPUT[] en una sola llamada. Devuelve eventos inyectados."""
+    return _SendInput(len(inputs), inputs, ctypes.sizeof(INPUT))
+
+
+def clipboard_sequence() -> int:
+    """Número de secuencia del portapapeles (cambia con cada escritura)."""
+    return _GetClipboardSequenceNumber()
+
+
+def wait_clipboard_change(previous: int, timeout: float) -> bool:
+    """
+    Espera a que el portapapeles cambie respecto a `previous`.
+
+    Returns:
+        True si cambió antes del timeout
+    """
+    deadline = time.perf_counter() + timeout
+    while _GetClipboardSequenceNumber() == previous:
+        if time.perf_counter() >= deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+class _Clipboard:
+    """Operaciones sobre el portapapeles ya abierto (ver clipboard_session)."""
+
+    def get_text(self) -> str:
+        """Lee el texto Unicode del portapapeles ("" si no hay)."""
+        handle = _GetClipboardData(CF_UNICODETEXT)
+        if not handle:
+            return ""
+        ptr = _GlobalLock(handle)
+        if not ptr:
+            return ""
+        try:
+            return ctypes.wstring_at(ptr)
+        finally:
+            _GlobalUnlock(handle)
+
+    def set_text(self, text: str):
+        """
+        Reemplaza el contenido del portapapeles por `text`.
+
+        La memoria se prepara antes de vaciarlo: si falla la reserva, el
+        contenido anterior sigue ahí.
+        """
+        if not text:
+            _EmptyClipboard()
+            return
+        data = ctypes.create_unicode_buffer(text)
+        size = ctypes.sizeof(data)
+        handle = _GlobalAlloc(GMEM_MOVEABLE, size)
+        if not handle:
+            raise ctypes.WinError(ctypes.get_last_error())
+        ptr = _GlobalLock(handle)
+        if not ptr:
+            error = ctypes.WinError(ctypes.get_last_error())
+            _GlobalFree(handle)
+            raise error
+        ctypes.memmove(ptr, data, size)
+        _GlobalUnlock(handle)
+        _EmptyClipboard()
+        if not _SetClipboardData(CF_UNICODETEXT, handle):
+            # Si SetClipboardData falla, la memoria sigue siendo nuestra
+            _GlobalFree(handle)
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def clear(self):
+        """Vacía el portapapeles."""
+        _EmptyClipboard()
+
+
+@contextmanager
+def clipboard_session(retries: int = 10):
+    """
+    Abre el portapapeles una sola vez para varias operaciones.
+
+    Otro proceso puede tenerlo abierto momentáneamente, así que se
+    reintenta unas cuantas veces antes de fallar.
+
+    SetClipboardData falla si el portapapeles se abre sin ventana
+    propietaria, así que se crea una ventana message-only (invisible)
+    para la sesión, como hace pyperclip.
+
+    Uso:
+        with clipboard_session() as cb:
+            texto = cb.get_text()
+            cb.set_text(texto.upper())
+    """
+    owner = _CreateWindowExW(0, "STATIC", None, 0, 0, 0, 0, 0,
+                             HWND_MESSAGE, None, None, None)
+    if not owner:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        for _ in range(retries):
+            if _OpenClipboard(owner):
+                break
+            time.sleep(0.01)
+        else:
+            raise ctypes.WinError(ctypes.get_last_error())
+        try:
+            yield _Clipboard()
+        finally:
+            _CloseClipboard()
+    finally:
+        _DestroyWindow(owner)
+
+
+def paste_text() -> str:
+    """Lee el texto del portapapeles (una apertura, sin pyperclip)."""
+    with clipboard_session() as cb:
+        return cb.get_text()
@@ -53,9 +53,12 @@ def main():
     )
     from core.state import State
     from core.commands import CommandRegistry
-    from core.logger import get_logger
+    from core.logger import get_logger, setup_console_logging
     from config.settings import load_config, print_config_validation
 
+    # Logs de módulos (navegador, watcher...) a consola vía cola
+    setup_console_logging()
+
     # Parse arguments
     args = parse_args()
     debug_mode = args.debug
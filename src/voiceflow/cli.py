@@ -303,11 +303,13 @@ def _run_legacy_main(daemon, vf_config, debug_mode):
     )
     from core.state import State
     from core.commands import CommandRegistry
-    from core.logger import get_logger
+    from core.logger import get_logger, setup_console_logging
     from config.settings import load_config as load_legacy_config, print_config_validation
 
     import threading
 
+    setup_console_logging()
+
     # Use legacy config (config.json) for UI/engine settings
     args = parse_args()
     if debug_mode:
@@ -1,3 +1,4 @@
+from collections import Counter
 from dataclasses import dataclass, field
 from typing import Callable, Optional
 import threading
@@ -9,9 +10,39 @@ from voiceflow.core.state import State
 class Command:
     keywords: list[str]           # ["listo", "lista"]
     action: Callable[[], None]    # Funcion a ejecutar
-    allowed_states: list[State] = field(default_factory=lambda: [State.IDLE])
+    allowed_states: frozenset[State] = field(default_factory=lambda: frozenset({State.IDLE}))
     sound: Optional[str] = None   # Sonido al ejecutar
     next_state: Optional[State] = None  # Estado resultante (para encadenamiento)
+    source: str = "builtin"       # Origen ("builtin", "custom"); lo fija el registry
+
+    def __post_init__(self):
+        # Se aceptan listas por comodidad; frozenset da `state in` en O(1)
+        self.allowed_states = frozenset(self.allowed_states)
+
+
+# Resultados recordados por índice; al llenarse se vacía (Vosk repite
+# pocas frases, no hace falta un LRU)
+MEMO_SIZE = 512
+_MISS = object()
+
+
+@dataclass
+class _SearchIndex:
+    """Índices de búsqueda de un conjunto de comandos (no se modifican tras crearse)."""
+    exact_by_state: dict[State, dict[str, Command]]        # estado -> keyword -> comando
+    by_length: dict[State, list[tuple[str, Command]]]      # estado -> keyword más largo primero
+    max_kw_words: int                                      # palabras del keyword más largo
+    # (estado, texto) -> resultado ya resuelto con este índice. Un cambio de
+    # comandos crea otro índice, así que nunca hay que invalidar a mano.
+    find_memo: dict = field(default_factory=dict)
+    chain_memo: dict = field(default_factory=dict)
+
+
+def _remember(memo: dict, key, value) -> None:
+    """Guarda un resultado en la memo, vaciándola si llegó a MEMO_SIZE."""
+    if len(memo) >= MEMO_SIZE:
+        memo.clear()
+    memo[key] = value
 
 
 class CommandRegistry:
@@ -23,15 +54,20 @@ class CommandRegistry:
     """
 
     def __init__(self):
-        self._commands: list[Command] = []
-        self._command_sources: dict[int, str] = {}  # id(cmd) -> source
-        self._lock = threading.RLock()
+        # Copy-on-write: los cambios publican una tupla nueva, así quien la
+        # recorre (índice, ayuda) ve una instantánea estable sin tomar el lock
+        self._commands: tuple[Command, ...] = ()
+        self._lock = threading.Lock()  # Solo escrituras y reconstrucción del índice
+        # Índice de búsqueda; None tras un cambio, se reconstruye en el
+        # siguiente find(). Los lectores lo usan sin tomar el lock.
+        self._index: Optional[_SearchIndex] = None
 
     def register(self, command: Command, source: str = "builtin") -> None:
         """Register a command with source tracking."""
         with self._lock:
-            self._commands.append(command)
-            self._command_sources[id(command)] = source
+            command.source = source
+            self._commands = (*self._commands, command)
+            self._index = None
 
     def unregister_by_source(self, source: str) -> int:
         """
@@ -41,14 +77,13 @@ class CommandRegistry:
             Number of commands removed
         """
         with self._lock:
-            to_remove = [
-                cmd for cmd in self._commands
-                if self._command_sources.get(id(cmd)) == source
-            ]
-            for cmd in to_remove:
-                self._commands.remove(cmd)
-                del self._command_sources[id(cmd)]
-            return len(to_remove)
+            # Una sola pasada (list.remove por comando sería O(n²) en un reload)
+            kept = tuple(cmd for cmd in self._commands if cmd.source != source)
+            removed = len(self._commands) - len(kept)
+            if removed:
+                self._commands = kept
+                self._index = None
+            return removed
 
     def register_batch(self, commands: list[Command], source: str) -> int:
         """
@@ -59,26 +94,37 @@ class CommandRegistry:
         """
         with self._lock:
             for cmd in commands:
-                self._commands.append(cmd)
-                self._command_sources[id(cmd)] = source
+                cmd.source = source
+            self._commands = (*self._commands, *commands)
+            self._index = None
             return len(commands)
 
+    def replace_source(self, source: str, commands: list[Command]) -> tuple[int, int]:
+        """
+        Atomically replace every command from a source with a new set.
+
+        Readers see either the old or the new commands, never a registry
+        without that source in between (hot reload).
+
+        Returns:
+            Tuple of (removed, registered)
+        """
+        with self._lock:
+            kept = tuple(cmd for cmd in self._commands if cmd.source != source)
+            removed = len(self._commands) - len(kept)
+            for cmd in commands:
+                cmd.source = source
+            self._commands = (*kept, *commands)
+            self._index = None
+            return removed, len(commands)
+
     def get_commands_by_source(self, source: str) -> list[Command]:
         """Get all commands from a specific source."""
-        with self._lock:
-            return [
-                cmd for cmd in self._commands
-                if self._command_sources.get(id(cmd)) == source
-            ]
+        return [cmd for cmd in self._commands if cmd.source == source]
 
     def get_source_counts(self) -> dict[str, int]:
         """Get count of commands by source."""
-        with self._lock:
-            counts: dict[str, int] = {}
-            for cmd in self._commands:
-                source = self._command_sources.get(id(cmd), "unknown")
-                counts[source] = counts.get(source, 0) + 1
-            return counts
+        return dict(Counter(cmd.source for cmd in self._commands))
 
     def find(self, text: str, current_state: State) -> Optional[Command]:
         """
@@ -93,30 +139,75 @@ class CommandRegistry:
         - "test terminal" vs "test" → gana "test terminal" (más largo)
         """
         text_lower = text.lower().strip()
+        index = self._get_index()
+
+        # Vosk repite frases: reutilizar lo ya resuelto con este índice
+        key = (current_state, text_lower)
+        cmd = index.find_memo.get(key, _MISS)
+        if cmd is _MISS:
+            cmd = self._find_in_index(index, text_lower, current_state)
+            _remember(index.find_memo, key, cmd)
+        return cmd
+
+    def _find_in_index(self, index: _SearchIndex, text_lower: str,
+                       current_state: State) -> Optional[Command]:
+        """Matching de find() sobre un índice concreto."""
+        # Match exacto tiene máxima prioridad (una consulta al dict)
+        cmd = index.exact_by_state.get(current_state, {}).get(text_lower)
+        if cmd is not None:
+            return cmd
+
+        # Si no es exacto, el keyword más largo contenido en el texto.
+        # Cada lista de by_length solo tiene comandos válidos en ese
+        # estado y está ordenada de mayor a menor longitud (estable: a
+        # igual longitud gana el orden de registro), así que el primero
+        # que aparece en el texto es el mejor.
+        for keyword, cmd in index.by_length.get(current_state, ()):
+            if keyword in text_lower:
+                return cmd
 
-        best_match: Optional[Command] = None
-        best_keyword_len = 0
-
-        with self._lock:
-            for cmd in self._commands:
-                if current_state not in cmd.allowed_states:
-                    continue
+        return None
 
-                for keyword in cmd.keywords:
-                    # Verificar si el keyword está contenido en el texto
-                    if keyword not in text_lower:
-                        continue
+    def _get_index(self) -> _SearchIndex:
+        """
+        Devuelve el índice de búsqueda, reconstruyéndolo si hubo cambios.
 
-                    # Match exacto tiene máxima prioridad
-                    if text_lower == keyword:
-                        return cmd
+        El camino habitual (índice vigente) no toma el lock: el índice no se
+        modifica nunca, los cambios lo sustituyen por otro. Así varios
+        lectores (audio, hot reload, event server) no se bloquean entre sí.
+        """
+        index = self._index
+        if index is not None:
+            return index
+        with self._lock:
+            if self._index is None:
+                self._index = self._build_index()
+            return self._index
 
-                    # Si no es exacto, preferir keyword más largo
-                    if len(keyword) > best_keyword_len:
-                        best_keyword_len = len(keyword)
-                        best_match = cmd
+    def _build_index(self) -> _SearchIndex:
+        """
+        Construye los índices de búsqueda de los comandos actuales.
 
-        return best_match
+        Note: Caller must hold the lock.
+        """
+        exact_by_state: dict[State, dict[str, Command]] = {}
+        by_length: dict[State, list[tuple[str, Command]]] = {}
+        max_words = 0
+        for cmd in self._commands:
+            for keyword in cmd.keywords:
+                # Normalizado una vez aquí: los keywords de JSON pueden traer mayúsculas
+                keyword = keyword.lower().strip()
+                for state in cmd.allowed_states:
+                    # Una entrada por keyword y estado: gana el primero registrado
+                    by_keyword = exact_by_state.setdefault(state, {})
+                    if keyword not in by_keyword:
+                        by_keyword[keyword] = cmd
+                        by_length.setdefault(state, []).append((keyword, cmd))
+                max_words = max(max_words, len(keyword.split()))
+        for pairs in by_length.values():
+            pairs.sort(key=lambda pair: len(pair[0]), reverse=True)
+
+        return _SearchIndex(exact_by_state, by_length, max_words)
 
     def find_chain(self, text: str, current_state: State) -> list[Command]:
         """
@@ -135,61 +226,64 @@ class CommandRegistry:
             Lista ordenada de comandos a ejecutar (puede estar vacía)
         """
         text_lower = text.lower().strip()
+        index = self._get_index()
+
+        key = (current_state, text_lower)
+        chain = index.chain_memo.get(key)
+        if chain is None:
+            chain = tuple(self._chain_in_index(index, text_lower, current_state))
+            _remember(index.chain_memo, key, chain)
+        # Copia: el llamador puede modificar la lista
+        return list(chain)
+
+    def _chain_in_index(self, index: _SearchIndex, text_lower: str,
+                        current_state: State) -> list[Command]:
+        """Detección de find_chain() sobre un índice concreto."""
+        commands: list[Command] = []
 
         # 1. Match exacto completo primero (aliases compuestos tienen prioridad)
-        exact = self.find(text, current_state)
-        if exact and any(text_lower == kw for kw in exact.keywords):
+        exact = index.exact_by_state.get(current_state, {}).get(text_lower)
+        if exact is not None:
             return [exact]
 
-        # 2. Tokenizar y buscar comandos individuales
+        # 2. Tokenizar y buscar comandos individuales. Las frases candidatas
+        # se cortan de `joined` con offsets en vez de unir palabras cada vez.
         words = text_lower.split()
-        commands: list[Command] = []
+        joined = " ".join(words)
+        starts = []
+        pos = 0
+        for word in words:
+            starts.append(pos)
+            pos += len(word) + 1
+        max_words = index.max_kw_words
         i = 0
         state = current_state
 
-        with self._lock:
-            while i < len(words):
-                # Intentar match del substring más largo posible
-                best_cmd: Optional[Command] = None
-                best_len = 0
-
-                for j in range(len(words), i, -1):
-                    phrase = " ".join(words[i:j])
-                    cmd = self._find_in_state(phrase, state)
-                    if cmd:
-                        best_cmd = cmd
-                        best_len = j - i
-                        break
-
-                if best_cmd:
-                    commands.append(best_cmd)
-                    # Actualizar estado para validar siguiente comando
-                    state = self._next_state(best_cmd, state)
-                    i += best_len
-                else:
-                    i += 1  # Saltar palabra no reconocida
+        while i < len(words):
+            # Intentar match del substring más largo posible (ningún
+            # keyword tiene más de max_words palabras)
+            best_cmd: Optional[Command] = None
+            best_len = 0
+            by_keyword = index.exact_by_state.get(state, {})
+
+            for j in range(min(i + max_words, len(words)), i, -1):
+                phrase = joined[starts[i]:starts[j - 1] + len(words[j - 1])]
+                cmd = by_keyword.get(phrase)
+                if cmd:
+                    best_cmd = cmd
+                    best_len = j - i
+                    break
+
+            if best_cmd:
+                commands.append(best_cmd)
+                # Actualizar estado para validar siguiente comando
+                state = self._next_state(best_cmd, state)
+                i += best_len
+            else:
+                i += 1  # Saltar palabra no reconocida
 
         return commands
 
-    def _find_in_state(self, text: str, state: State) -> Optional[Command]:
-        """
-        Busca un comando que coincida exactamente con el texto en un estado dado.
-
-        A diferencia de find(), solo busca match exacto (keyword == text).
-        Note: Caller must hold the lock or call from within locked context.
-        """
-        text_lower = text.lower().strip()
-
-        for cmd in self._commands:
-            if state not in cmd.allowed_states:
-                continue
-
-            for keyword in cmd.keywords:
-                if text_lower == keyword:
-                    return cmd
-
-        return None
-
     def _next_state(self, cmd: Command, current: State) -> State:
         """
         Determina el estado resultante después de ejecutar un comando.
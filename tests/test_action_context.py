@@ -398,3 +398,28 @@ class TestLogAction:
         result = executor._execute_one(action, context)
 
         assert result == "test message"
+
+
+class TestCompilePipeline:
+    """Test pipelines prepared once at load time."""
+
+    @patch('core.action_executor.pyperclip.paste')
+    def test_skips_clipboard_when_unused(self, mock_paste, executor):
+        """A pipeline that never uses {clipboard} should not read it."""
+        run = executor.compile_pipeline([{"type": "log", "message": "{date}"}], "test")
+
+        assert run() is True
+        mock_paste.assert_not_called()
+
+    @patch('core.action_executor.pyperclip.paste')
+    def test_reads_clipboard_for_nested_actions(self, mock_paste, executor):
+        """{clipboard} inside a condition branch still loads the clipboard."""
+        mock_paste.return_value = "hola"
+        run = executor.compile_pipeline([{
+            "type": "condition",
+            "if": "x",
+            "then": [{"type": "log", "message": "{clipboard}"}]
+        }], "test")
+
+        assert run() is True
+        mock_paste.assert_called_once()
@@ -0,0 +1,33 @@
+"""
+Tests for dictation cleanup in core.actions.
+"""
+
+
+def _cleanup():
+    """Import lazily: core.actions needs pyautogui (a display) at import time."""
+    from core.actions import _limpiar_comandos_finales, _preparar_dictado
+    return _limpiar_comandos_finales, _preparar_dictado
+
+
+def test_strips_multiword_wake_word_without_trailing_command():
+    """Test that a multi-word wake word is removed even with no command at the end."""
+    limpiar, _ = _cleanup()
+    assert limpiar("hey jarvis texto normal") == "texto normal"
+
+
+def test_strips_multiword_wake_word_and_trailing_command():
+    """Test that both the wake word and the trailing command are removed."""
+    limpiar, _ = _cleanup()
+    assert limpiar("hey jarvis texto normal listo") == "texto normal"
+
+
+def test_plain_text_is_kept():
+    """Test that text without wake words or commands is left alone."""
+    limpiar, _ = _cleanup()
+    assert limpiar("texto normal") == "texto normal"
+
+
+def test_preparar_dictado_capitalizes():
+    """Test that the cleaned dictation starts with a capital letter."""
+    _, preparar = _cleanup()
+    assert preparar("alexa texto normal listo") == "Texto normal"
@@ -182,3 +182,69 @@ def test_find_chain_with_lock():
         t.join()
 
     assert not errors, f"Errors occurred: {errors}"
+
+
+def test_find_index_refreshes_after_changes():
+    """Test that lookups see commands registered/removed after a find()."""
+    registry = CommandRegistry()
+    registry.register(Command(keywords=["borra"], action=lambda: None), source="builtin")
+
+    assert registry.find("borra todo ya", State.IDLE).keywords[0] == "borra"
+
+    registry.register(Command(keywords=["borra todo"], action=lambda: None), source="custom")
+    assert registry.find("borra todo ya", State.IDLE).keywords[0] == "borra todo"
+
+    registry.unregister_by_source("custom")
+    assert registry.find("borra todo ya", State.IDLE).keywords[0] == "borra"
+
+
+def test_keywords_matched_case_insensitively():
+    """Test that keywords with uppercase (e.g. from JSON) still match."""
+    registry = CommandRegistry()
+    registry.register(Command(keywords=["Abre Chrome"], action=lambda: None), source="custom")
+    registry.register(Command(keywords=["enter"], action=lambda: None), source="builtin")
+
+    assert registry.find("abre chrome", State.IDLE) is not None
+    chain = registry.find_chain("abre   chrome enter", State.IDLE)
+    assert [cmd.keywords[0] for cmd in chain] == ["Abre Chrome", "enter"]
+
+
+def test_find_chain_memo_returns_fresh_lists():
+    """Test that repeated find_chain calls reuse results without sharing the list."""
+    registry = CommandRegistry()
+    registry.register(Command(keywords=["copia"], action=lambda: None), source="builtin")
+
+    first = registry.find_chain("copia copia", State.IDLE)
+    first.clear()
+    second = registry.find_chain("copia copia", State.IDLE)
+
+    assert [cmd.keywords[0] for cmd in second] == ["copia", "copia"]
+
+    registry.register(Command(keywords=["copia copia"], action=lambda: None), source="custom")
+    assert [cmd.keywords[0] for cmd in registry.find_chain("copia copia", State.IDLE)] == ["copia copia"]
+
+
+def test_register_sets_command_source():
+    """Test that the registry tags each command with its source."""
+    registry = CommandRegistry()
+    cmd = Command(keywords=["abre"], action=lambda: None)
+    registry.register_batch([cmd], "custom")
+
+    assert cmd.source == "custom"
+    assert registry.get_commands_by_source("custom") == [cmd]
+    assert registry.get_source_counts() == {"custom": 1}
+
+
+def test_replace_source_swaps_in_one_step():
+    """Test that replace_source swaps one source's commands and keeps the rest."""
+    registry = CommandRegistry()
+    registry.register(Command(keywords=["builtin"], action=lambda: None), source="builtin")
+    registry.register(Command(keywords=["old"], action=lambda: None), source="custom")
+
+    new = [Command(keywords=["new1"], action=lambda: None),
+           Command(keywords=["new2"], action=lambda: None)]
+    assert registry.replace_source("custom", new) == (1, 2)
+
+    assert registry.find("old", State.IDLE) is None
+    assert registry.find("new2", State.IDLE) is new[1]
+    assert registry.get_source_counts() == {"builtin": 1, "custom": 2}
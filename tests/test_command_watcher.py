@@ -268,3 +268,85 @@ def test_watcher_is_running_property(temp_commands_dir, mock_registry, mock_load
 
     # Note: We don't test start() here because it requires watchdog
     # and would actually start monitoring. In a real test, you'd mock watchdog.
+
+
+def test_watcher_debounces_bursts_into_one_reload(temp_commands_dir, mock_registry):
+    """Test that a burst of file events triggers a single reload."""
+    watcher = CommandWatcher(
+        commands_dir=temp_commands_dir,
+        registry=mock_registry,
+        loader_factory=lambda: None,
+        config={},
+        debounce_seconds=0.1
+    )
+    reloads = []
+    watcher.reload = lambda: reloads.append(time.monotonic())
+
+    assert watcher.start()
+    try:
+        for _ in range(5):
+            watcher._on_file_change(None)
+            time.sleep(0.02)
+        time.sleep(0.4)
+        assert len(reloads) == 1
+    finally:
+        watcher.stop()
+
+    assert not watcher.is_running
+
+
+def test_watcher_skips_events_without_content_change(temp_commands_dir, mock_registry):
+    """Test that events for files unchanged since the last snapshot are ignored."""
+    path = write_command_json(temp_commands_dir, "test.json", [])
+    watcher = CommandWatcher(
+        commands_dir=temp_commands_dir,
+        registry=mock_registry,
+        loader_factory=lambda: None,
+        config={}
+    )
+    watcher._file_stats = watcher._snapshot_stats()
+
+    assert not watcher._file_changed(path)
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert watcher._file_changed(path)
+
+    os.remove(path)
+    assert watcher._file_changed(path)
+
+
+def test_watcher_incremental_reload_only_parses_changed_files(temp_commands_dir, mock_registry, mock_loader_factory):
+    """Test that an incremental reload re-parses only the changed files."""
+    write_command_json(temp_commands_dir, "a.json", [
+        {"name": "a", "keywords": ["a"], "actions": [{"type": "key", "key": "a"}]}
+    ])
+    write_command_json(temp_commands_dir, "b.json", [
+        {"name": "b", "keywords": ["b"], "actions": [{"type": "key", "key": "b"}]}
+    ])
+    watcher = CommandWatcher(
+        commands_dir=temp_commands_dir,
+        registry=mock_registry,
+        loader_factory=mock_loader_factory,
+        config={}
+    )
+    assert watcher.reload().commands_loaded == 2
+
+    path_b = write_command_json(temp_commands_dir, "b.json", [
+        {"name": "b1", "keywords": ["b1"], "actions": [{"type": "key", "key": "b"}]},
+        {"name": "b2", "keywords": ["b2"], "actions": [{"type": "key", "key": "c"}]}
+    ])
+    result = watcher._reload_files({"b.json"})
+
+    assert result.success
+    assert result.files_processed == [path_b]
+    assert result.commands_loaded == 3
+    assert mock_registry.get_source_counts().get("custom", 0) == 3
+
+    # Deleting a file drops only its commands
+    os.remove(os.path.join(temp_commands_dir, "a.json"))
+    result = watcher._reload_files({"a.json"})
+
+    assert result.success
+    assert result.commands_loaded == 2
+    assert mock_registry.get_source_counts().get("custom", 0) == 2
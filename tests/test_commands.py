@@ -2,6 +2,8 @@
 Tests for core.commands module.
 """
 
+import os
+
 import pytest
 from core.commands import CommandRegistry, Command
 from core.state import State
@@ -110,6 +112,28 @@ def test_command_defaults():
         action=lambda: None
     )
 
-    assert cmd.allowed_states == [State.IDLE]
+    assert cmd.allowed_states == frozenset({State.IDLE})
     assert cmd.sound is None
     assert cmd.next_state is None
+
+
+def test_command_allowed_states_frozenset():
+    """Test allowed_states given as a list is stored as a frozenset."""
+    cmd = Command(
+        keywords=["test"],
+        action=lambda: None,
+        allowed_states=[State.IDLE, State.DICTATING, State.IDLE]
+    )
+
+    assert cmd.allowed_states == frozenset({State.IDLE, State.DICTATING})
+
+
+def test_packaged_commands_module_in_sync():
+    """Test src/voiceflow/core/commands.py mirrors core/commands.py (only imports differ)."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "core", "commands.py"), encoding="utf-8") as f:
+        legacy = f.read()
+    with open(os.path.join(root, "src", "voiceflow", "core", "commands.py"), encoding="utf-8") as f:
+        packaged = f.read()
+
+    assert packaged == legacy.replace("from core.", "from voiceflow.core.")
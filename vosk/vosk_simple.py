@@ -20,6 +20,7 @@ pip install vosk sounddevice pyautogui
 
 import json
 import queue
+import re
 import subprocess
 import time
 import sounddevice as sd
@@ -39,6 +40,9 @@ MODEL_PATH = "vosk-model-small-es-0.42"
 modo_claudia = False  # True = esperando "listo" o "cancela"
 q = queue.Queue()
 
+# "listo" y puntos a eliminar del texto dictado (una sola pasada)
+_LISTO_RE = re.compile(r'listo|\.', re.IGNORECASE)
+
 # ============================================
 # ACCIONES
 # ============================================
@@ -94,10 +98,9 @@ def on_listo():
     import pyperclip
     texto = pyperclip.paste()
     # Limpiar "listo" y variantes
-    texto_limpio = texto.lower().replace("listo", "").replace(".", "").strip()
-    # Capitalizar primera letra si hay texto
-    if texto_limpio:
-        texto_limpio = texto_limpio[0].upper() + texto_limpio[1:] if len(texto_limpio) > 1 else texto_limpio.upper()
+    texto_limpio = _LISTO_RE.sub('', texto).strip()
+    # Capitalizar primera letra ([:1] cubre texto vacío o de un carácter)
+    texto_limpio = texto_limpio[:1].upper() + texto_limpio[1:]
     
     pyperclip.copy(texto_limpio)
     pyautogui.hotkey('ctrl', 'v')